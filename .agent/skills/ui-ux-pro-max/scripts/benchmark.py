@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Search and Design System Benchmarks - wall-clock timing of generate_design_system()
+with persistence, once per search executor.
+
+Usage:
+    python benchmark.py [--query "SaaS dashboard"] [--page dashboard[,settings...]] [--runs 20]
+                        [--executor serial,thread,process] [--warm] [--json]
+    python benchmark.py --stress [--threads 1,2,4,8] [--seconds 2] [--min-scaling 0.6] [--json]
+    python benchmark.py --pools process,thread,interpreter [--projects 48] [--workers N] [--json]
+    python benchmark.py --suite [--scales 10,100,1000] [--runs 20] [--output results.json]
+                        [--compare baseline.json [--threshold 0.2] [--normalize] [--results results.json]]
+
+Each run writes MASTER.md and the page overrides into a temporary
+directory. The result cache is cleared before every run (unless --warm)
+so each run pays for its searches; indices stay loaded, as in a
+long-lived process.
+
+--pools times generate_manifest() on a synthetic manifest once per worker
+pool, pool start-up included, and reports projects/s plus peak RSS of this
+process and of its child processes.
+
+--stress hammers search(), search_stack() and generate() from 1, 2, 4, ...
+threads sharing one registry, result cache and generator. Every answer is
+compared with a single-threaded reference, and each round starts from an
+empty registry so first uses race to build the indices. On a free-threaded
+build, throughput at N threads (N <= cores) must reach min-scaling * N times
+the single-thread rate. Exit code 1 on a wrong answer, a duplicate index
+load or missed scaling.
+
+--suite times every stage and reports p50/p95/mean per case:
+BM25.fit and BM25.score on each shipped domain CSV and on synthetic
+corpora 10x/100x/1000x the size of styles.csv (seeded, so reruns fit the
+same documents), search()/search_stack() cold (empty registry) and warm
+(index resident, result cache cleared), detect_domain(), and
+generate_design_system() with and without persist. --output writes the
+JSON report; --compare BASELINE exits 1 when a case's p50 or p95 exceeds
+the baseline by more than --threshold (and by more than --min-delta-ms,
+so sub-millisecond jitter does not fail a run). --results compares a
+saved report instead of running the suite. Each report records a fixed
+pure-Python calibration workload; --normalize scales the current timings
+by the calibration ratio, to compare across machines or a throttled host.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import core
+import design_system
+
+# ============ CONFIGURATION ============
+QUERY = "SaaS analytics dashboard"
+PROJECT = "Benchmark"
+PAGE = "dashboard"
+RUNS = 20
+
+# Stress mode
+STRESS_THREADS = [1, 2, 4, 8]
+STRESS_SECONDS = 2.0
+STRESS_CACHE_SIZE = 64  # smaller than the query mix: constant hits, misses and evictions
+STRESS_DOMAINS = ["style", "color", "ux", "landing", "typography", "product", "chart"]
+STRESS_STACKS = ["html-tailwind", "react", "nextjs"]
+STRESS_WORDS = ["saas", "dashboard", "minimal", "dark", "fintech", "luxury", "spa", "game",
+                "health", "glass", "bold", "clean", "modern", "retro", "ecommerce", "form"]
+MIN_SCALING = 0.6
+
+# Manifest pools
+MANIFEST_PROJECTS = 48
+MANIFEST_QUERIES = ["SaaS analytics dashboard", "luxury spa wellness", "fintech banking app",
+                    "kids education game", "ecommerce fashion store", "developer tools docs"]
+MANIFEST_PAGES = ["dashboard", "checkout", "settings", "blog", "landing", "pricing"]
+
+# Suite
+SUITE_VERSION = 1
+SUITE_SCALES = [10, 100, 1000]
+SUITE_BASE_DOMAIN = "style"  # synthetic corpora are scaled copies of this CSV
+SUITE_SEED = 1234
+SUITE_QUERIES = ["glassmorphism dark", "minimal clean saas", "luxury elegant serif", "real-time dashboard",
+                 "accessibility animation", "fintech crypto bold", "playful kids game", "ecommerce checkout form"]
+SUITE_STACK = "html-tailwind"
+CALIBRATION_LOOPS = 200000
+SAMPLE_MIN_MS = 5.0  # fast cases repeat within one sample until it takes this long
+THRESHOLD = 0.2
+MIN_DELTA_MS = 0.05
+
+
+def time_generate(executor, query=QUERY, page=PAGE, runs=RUNS, warm=False):
+    """Timings (ms) of generate_design_system(persist=True) on one executor"""
+    design_system.configure_search_executor(executor)
+    timings = []
+    plan = None
+    with tempfile.TemporaryDirectory() as output_dir:
+        # Untimed warm-up: loads indices and starts pool workers
+        design_system.generate_design_system(query, PROJECT, persist=True, page=page, output_dir=output_dir)
+        for _ in range(runs):
+            if not warm:
+                core.clear_result_cache()
+            plan = design_system.SearchPlan()
+            start = time.perf_counter()
+            design_system.generate_design_system(query, PROJECT, persist=True, page=page, output_dir=output_dir,
+                                                 plan=plan)
+            timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "executor": design_system.search_executor(),
+        "runs": runs,
+        "best_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "searches": plan.report() if plan is not None else None
+    }
+
+
+def _peak_rss_mb():
+    """Peak RSS (MiB) of this process and of its waited-for children, or (None, None)"""
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024  # ru_maxrss: bytes on macOS, KiB elsewhere
+    return tuple(round(resource.getrusage(who).ru_maxrss / scale, 1)
+                 for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+
+
+def time_manifest(pool, projects=MANIFEST_PROJECTS, workers=None):
+    """Wall-clock of generate_manifest() over a synthetic manifest on one pool kind"""
+    entries = [{"line": i + 1, "query": MANIFEST_QUERIES[i % len(MANIFEST_QUERIES)], "project_name": f"Project {i}",
+                "pages": [MANIFEST_PAGES[i % len(MANIFEST_PAGES)], MANIFEST_PAGES[(i + 1) % len(MANIFEST_PAGES)]]}
+               for i in range(projects)]
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        statuses = list(design_system.generate_manifest(entries, output_dir, workers, pool))
+        elapsed = time.perf_counter() - start
+    rss_self, rss_children = _peak_rss_mb()
+    return {
+        "pool": pool,
+        "effective_pool": design_system.manifest_pool(pool),
+        "workers": workers or os.cpu_count() or 1,
+        "projects": projects,
+        "failed": sum(status["status"] != "ok" for status in statuses),
+        "seconds": round(elapsed, 3),
+        "projects_per_s": round(projects / elapsed, 1),
+        "peak_rss_mb": rss_self,
+        "peak_children_rss_mb": rss_children
+    }
+
+
+def _stress_ops(generator):
+    """(function, args) mix over search(), search_stack() and generate()"""
+    ops = []
+    for i, words in enumerate(itertools.combinations(STRESS_WORDS, 2)):
+        query = " ".join(words)
+        ops.append((core.search, (query, STRESS_DOMAINS[i % len(STRESS_DOMAINS)])))
+        ops.append((core.search_stack, (query, STRESS_STACKS[i % len(STRESS_STACKS)])))
+        if i % 4 == 0:
+            ops.append((generator.generate, (query,)))
+    return ops
+
+
+def _stress_round(ops, expected, threads, seconds):
+    """Run ops round-robin on `threads` threads for `seconds`; count ops and wrong answers"""
+    core.clear_index_registry()
+    core.clear_result_cache()
+    stop = threading.Event()
+    start_line = threading.Barrier(threads + 1)
+    counts = [0] * threads
+    mismatches = []
+
+    def worker(tid):
+        pos = tid * len(ops) // threads
+        done = 0
+        start_line.wait()
+        while not stop.is_set():
+            function, args = ops[pos]
+            if function(*args) != expected[pos]:
+                mismatches.append((function.__name__, args))
+            pos = (pos + 1) % len(ops)
+            done += 1
+        counts[tid] = done
+
+    workers = [threading.Thread(target=worker, args=(tid,)) for tid in range(threads)]
+    for thread in workers:
+        thread.start()
+    start_line.wait()
+    start = time.perf_counter()
+    time.sleep(seconds)
+    stop.set()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "threads": threads,
+        "ops": sum(counts),
+        "ops_per_s": round(sum(counts) / elapsed, 1),
+        "mismatches": len(mismatches),
+        "index_loads": core.index_stats()["misses"],
+        "indices": core.index_stats()["indices"]
+    }
+
+
+def stress(threads=STRESS_THREADS, seconds=STRESS_SECONDS, min_scaling=MIN_SCALING):
+    """Concurrent search/search_stack/generate throughput per thread count"""
+    design_system.configure_search_executor("serial")  # concurrency comes from the stress threads
+    core.configure_result_cache(maxsize=STRESS_CACHE_SIZE)
+    generator = design_system.DesignSystemGenerator()
+    ops = _stress_ops(generator)
+    expected = [function(*args) for function, args in ops]
+
+    cores = os.cpu_count() or 1
+    free_threaded = design_system._free_threaded()
+    rounds = [_stress_round(ops, expected, n, seconds) for n in sorted(set([1, *threads]))]
+    base = rounds[0]["ops_per_s"] or 1.0
+    ok = True
+    for report in rounds:
+        report["speedup"] = round(report["ops_per_s"] / base, 2)
+        # Scaling is only expected without the GIL, and only up to the core count
+        report["scaling_checked"] = free_threaded and 1 < report["threads"] <= cores
+        report["scaling_ok"] = (not report["scaling_checked"]
+                                or report["speedup"] >= min_scaling * report["threads"])
+        ok = ok and report["scaling_ok"] and not report["mismatches"] \
+            and report["index_loads"] == report["indices"]
+    core.configure_result_cache(maxsize=core.RESULT_CACHE_SIZE)
+    design_system.configure_search_executor(None)
+    return {
+        "python": sys.version.split()[0],
+        "free_threaded": free_threaded,
+        "cores": cores,
+        "ops_in_mix": len(ops),
+        "rounds": rounds,
+        "ok": ok
+    }
+
+
+# ============ SUITE ============
+def _percentiles(timings):
+    """p50/p95/mean (ms) of a list of timings in ms"""
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))]
+    return {
+        "runs": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 4),
+        "p95_ms": round(p95, 4),
+        "mean_ms": round(statistics.fmean(ordered), 4)
+    }
+
+
+def _measure(function, runs, setup=None):
+    """Per-call ms of function() over `runs` samples, after one untimed warm-up.
+
+    Like timeit, the garbage collector is off while timing and a sample
+    repeats a fast call until it lasts SAMPLE_MIN_MS. With setup (run
+    untimed before each call, e.g. to empty caches) every sample is a
+    single call.
+    """
+    import gc
+
+    if setup:
+        setup()
+    start = time.perf_counter()
+    function()
+    first_ms = (time.perf_counter() - start) * 1000
+    number = 1 if setup else max(1, int(SAMPLE_MIN_MS / max(first_ms, 1e-3)))
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(runs):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            for _ in range(number):
+                function()
+            timings.append((time.perf_counter() - start) * 1000 / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return dict(_percentiles(timings), number=number)
+
+
+def _calibrate():
+    """Best-of-5 ms of a fixed pure-Python loop: a yardstick for this host's speed"""
+    def workload():
+        total = 0
+        for i in range(CALIBRATION_LOOPS):
+            total += i * i % 7
+        return total
+
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        workload()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def _domain_documents(domain):
+    config = core.CSV_CONFIG[domain]
+    return [core._document(row, config["search_cols"]) for row in core._read_csv(core.DATA_DIR / config["file"])]
+
+
+def synthetic_corpus(scale, seed=SUITE_SEED):
+    """scale x the base CSV's documents: each copy shuffles the words and adds
+    one copy-specific term, so the vocabulary grows with the corpus"""
+    rng = random.Random(seed)
+    documents = []
+    for copy in range(scale):
+        for document in _domain_documents(SUITE_BASE_DOMAIN):
+            words = document.split()
+            rng.shuffle(words)
+            words.append(f"synthetic{copy}")
+            documents.append(" ".join(words))
+    return documents
+
+
+def _bm25_cases(name, documents, bm25_class, runs):
+    """fit/<name> and score/<name> (score: all SUITE_QUERIES per timed call)"""
+    bm25 = bm25_class()
+    cases = {f"fit/{name}": dict(_measure(lambda: bm25_class().fit(documents), runs), docs=len(documents))}
+    bm25.fit(documents)
+    cases[f"score/{name}"] = dict(_measure(lambda: [bm25.score(query) for query in SUITE_QUERIES], runs),
+                                  queries=len(SUITE_QUERIES))
+    return cases
+
+
+def _cold():
+    core.clear_index_registry()
+    core.clear_result_cache()
+
+
+def suite(scales=SUITE_SCALES, runs=RUNS, backend=None):
+    """Run every benchmark case; returns the JSON-ready report"""
+    backend = core._resolve_backend(backend)
+    bm25_class = core.BACKENDS[backend]
+    design_system.configure_search_executor("serial")
+    calibration = [_calibrate()]
+    cases = {}
+
+    for domain in core.CSV_CONFIG:
+        cases.update(_bm25_cases(domain, _domain_documents(domain), bm25_class, runs))
+    for scale in scales:
+        # Fewer runs as the corpus grows: 1000x takes seconds per fit
+        cases.update(_bm25_cases(f"synthetic-{scale}x", synthetic_corpus(scale), bm25_class,
+                                 max(3, runs // max(1, scale // 10))))
+
+    query = SUITE_QUERIES[0]
+    cases["search/cold"] = _measure(lambda: core.search(query, "style", backend=backend), runs, _cold)
+    cases["search/warm"] = _measure(lambda: core.search(query, "style", backend=backend), runs,
+                                    core.clear_result_cache)
+    cases["search_stack/cold"] = _measure(lambda: core.search_stack(query, SUITE_STACK, backend=backend), runs, _cold)
+    cases["search_stack/warm"] = _measure(lambda: core.search_stack(query, SUITE_STACK, backend=backend), runs,
+                                          core.clear_result_cache)
+    cases["detect_domain"] = dict(_measure(lambda: [core.detect_domain(q) for q in SUITE_QUERIES], runs),
+                                  queries=len(SUITE_QUERIES))
+
+    cases["generate"] = _measure(lambda: design_system.generate_design_system(QUERY, PROJECT), runs,
+                                 core.clear_result_cache)
+    with tempfile.TemporaryDirectory() as output_dir:
+        cases["generate/persist"] = _measure(
+            lambda: design_system.generate_design_system(QUERY, PROJECT, persist=True, page=[PAGE],
+                                                         output_dir=output_dir),
+            runs, core.clear_result_cache)
+    design_system.configure_search_executor(None)
+    calibration.append(_calibrate())
+
+    return {
+        "suite_version": SUITE_VERSION,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cores": os.cpu_count() or 1,
+        "backend": backend,
+        "index_cache": core.INDEX_CACHE_ENABLED,
+        "calibration_ms": round(statistics.fmean(calibration), 4),
+        "cases": cases
+    }
+
+
+def compare(current, baseline, threshold=THRESHOLD, min_delta_ms=MIN_DELTA_MS, normalize=False):
+    """Per-case p50/p95 changes against a baseline report.
+
+    A metric regresses when it is more than `threshold` (fraction) and
+    more than `min_delta_ms` slower than the baseline. normalize scales
+    the current timings by the ratio of the calibration workloads.
+    """
+    scale = 1.0
+    if normalize and current.get("calibration_ms") and baseline.get("calibration_ms"):
+        scale = baseline["calibration_ms"] / current["calibration_ms"]
+    rows = []
+    for name, case in current["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is None:
+            rows.append({"case": name, "metric": None, "status": "new"})
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            before, after = base[metric], round(case[metric] * scale, 4)
+            ratio = after / before if before else float("inf")
+            regressed = after - before > min_delta_ms and ratio > 1 + threshold
+            rows.append({"case": name, "metric": metric, "baseline": before, "current": after,
+                         "ratio": round(ratio, 3), "status": "regressed" if regressed else "ok"})
+    rows.extend({"case": name, "metric": None, "status": "missing"}
+                for name in baseline["cases"] if name not in current["cases"])
+    return {
+        "threshold": threshold,
+        "min_delta_ms": min_delta_ms,
+        "scale": round(scale, 4),
+        "environment_differs": any(current.get(key) != baseline.get(key)
+                                   for key in ("python", "platform", "cores", "backend", "index_cache")),
+        "rows": rows,
+        "regressions": sum(row["status"] == "regressed" for row in rows)
+    }
+
+
+def _print_suite(report):
+    print(f"suite: Python {report['python']}, {report['backend']} backend, {report['cores']} cores, "
+          f"index cache {'on' if report['index_cache'] else 'off'}, calibration {report['calibration_ms']} ms")
+    print(f"  {'case':<28}{'runs':>6}{'p50 ms':>12}{'p95 ms':>12}{'mean ms':>12}")
+    for name, case in report["cases"].items():
+        print(f"  {name:<28}{case['runs']:>6}{case['p50_ms']:>12.4f}{case['p95_ms']:>12.4f}{case['mean_ms']:>12.4f}")
+
+
+def _print_comparison(comparison):
+    print(f"compare: threshold +{comparison['threshold']:.0%} and +{comparison['min_delta_ms']} ms"
+          + (f", current timings scaled x{comparison['scale']}" if comparison["scale"] != 1.0 else ""))
+    if comparison["environment_differs"]:
+        print("  warning: baseline was recorded on a different Python, platform, core count, backend or cache setting")
+    for row in comparison["rows"]:
+        if row["metric"] is None:
+            print(f"  {row['case']:<28}{row['status']}")
+        elif row["status"] == "regressed" or row["ratio"] < 1 - comparison["threshold"]:
+            print(f"  {row['case']:<28}{row['metric']:<8}{row['baseline']:>12.4f} -> {row['current']:>12.4f}"
+                  f"  x{row['ratio']:<7}{row['status']}")
+    print(f"{comparison['regressions']} regression(s)" if comparison["regressions"] else "OK")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the search engine and design-system generator")
+    parser.add_argument("--query", default=QUERY, help="Design system query")
+    parser.add_argument("--page", default=PAGE, help="Page override(s) to persist, comma-separated")
+    parser.add_argument("--runs", type=int, default=RUNS, help="Timed runs per executor")
+    parser.add_argument("--executor", default=",".join(design_system.SEARCH_EXECUTORS),
+                        help="Comma-separated executors to compare")
+    parser.add_argument("--warm", action="store_true", help="Keep the result cache between runs")
+    parser.add_argument("--json", action="store_true", help="Output JSON")
+    parser.add_argument("--stress", action="store_true", help="Multi-threaded correctness and scaling run")
+    parser.add_argument("--threads", default=",".join(map(str, STRESS_THREADS)), help="Thread counts for --stress")
+    parser.add_argument("--seconds", type=float, default=STRESS_SECONDS, help="Duration of each --stress round")
+    parser.add_argument("--min-scaling", type=float, default=MIN_SCALING,
+                        help="Required per-thread efficiency on free-threaded builds")
+    parser.add_argument("--pools", default=None, help="Compare manifest worker pools (comma-separated)")
+    parser.add_argument("--projects", type=int, default=MANIFEST_PROJECTS, help="Projects in the --pools manifest")
+    parser.add_argument("--workers", type=int, default=None, help="Workers for --pools (default: CPU count)")
+    parser.add_argument("--suite", action="store_true", help="Run the full benchmark suite (p50/p95 per case)")
+    parser.add_argument("--scales", default=",".join(map(str, SUITE_SCALES)),
+                        help="Synthetic corpus sizes for --suite, as multiples of the base CSV")
+    parser.add_argument("--backend", choices=list(core.BACKENDS.keys()), default=None, help="Scoring backend for --suite")
+    parser.add_argument("--output", default=None, metavar="FILE", help="Write the --suite report as JSON")
+    parser.add_argument("--compare", default=None, metavar="BASELINE",
+                        help="Fail (exit 1) when p50/p95 regress against a saved --suite report")
+    parser.add_argument("--results", default=None, metavar="FILE",
+                        help="With --compare: compare this saved report instead of running the suite")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="Allowed slowdown for --compare, as a fraction (default: 0.2)")
+    parser.add_argument("--min-delta-ms", type=float, default=MIN_DELTA_MS,
+                        help="Slowdowns below this many ms never count as regressions")
+    parser.add_argument("--normalize", action="store_true",
+                        help="With --compare: scale timings by the calibration workload ratio")
+    args = parser.parse_args(argv)
+
+    if args.suite or args.compare:
+        if args.results:
+            with open(args.results, encoding="utf-8") as f:
+                report = json.load(f)
+        else:
+            scales = [int(n) for n in args.scales.split(",") if n.strip()]
+            report = suite(scales, args.runs, args.backend)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        comparison = None
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                comparison = compare(report, json.load(f), args.threshold, args.min_delta_ms, args.normalize)
+        if args.json:
+            print(json.dumps({"report": report, "comparison": comparison} if comparison else report, indent=2))
+        else:
+            _print_suite(report)
+            if comparison:
+                _print_comparison(comparison)
+        return 1 if comparison and comparison["regressions"] else 0
+
+    if args.pools:
+        reports = [time_manifest(name.strip(), args.projects, args.workers)
+                   for name in args.pools.split(",") if name.strip()]
+        if args.json:
+            print(json.dumps(reports, indent=2))
+        else:
+            print(f"generate_manifest(): {args.projects} projects, 2 pages each")
+            for r in reports:
+                pool = r["pool"] if r["pool"] == r["effective_pool"] else f"{r['pool']}->{r['effective_pool']}"
+                print(f"  {pool:<22} {r['workers']} workers  {r['seconds']:7.3f} s  {r['projects_per_s']:8.1f} projects/s"
+                      f"  failed {r['failed']}  peak RSS {r['peak_rss_mb']} MiB (children {r['peak_children_rss_mb']} MiB)")
+        return 0 if not any(r["failed"] for r in reports) else 1
+
+    if args.stress:
+        threads = [int(n) for n in args.threads.split(",") if n.strip()]
+        report = stress(threads, args.seconds, args.min_scaling)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            mode = "free-threaded" if report["free_threaded"] else "GIL"
+            print(f"stress: Python {report['python']} ({mode}), {report['cores']} cores, "
+                  f"{report['ops_in_mix']} ops in the mix, {args.seconds}s per round")
+            for r in report["rounds"]:
+                scaling = ("ok" if r["scaling_ok"] else "LOW") if r["scaling_checked"] else "-"
+                print(f"  {r['threads']:>3} threads  {r['ops_per_s']:>10.1f} ops/s  x{r['speedup']:<5}"
+                      f"  scaling {scaling:<3}  mismatches {r['mismatches']}"
+                      f"  index loads {r['index_loads']}/{r['indices']}")
+            print("OK" if report["ok"] else "FAILED")
+        return 0 if report["ok"] else 1
+
+    pages = [page.strip() for page in args.page.split(",") if page.strip()]
+    reports = [time_generate(name.strip(), args.query, pages, args.runs, args.warm)
+               for name in args.executor.split(",") if name.strip()]
+    design_system.configure_search_executor(None)
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        print(f"generate_design_system({args.query!r}, persist=True, page={pages!r}), {args.runs} runs")
+        for report in reports:
+            print(f"  {report['executor']:<8} best {report['best_ms']:8.3f} ms"
+                  f"  median {report['median_ms']:8.3f} ms  mean {report['mean_ms']:8.3f} ms")
+        searches = reports[-1]["searches"] if reports else None
+        if searches:
+            print(f"  searches per run: {searches['requested']} requested, {searches['executed']} executed, "
+                  f"{searches['saved']} saved")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
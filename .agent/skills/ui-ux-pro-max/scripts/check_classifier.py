@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Keyword Lookup Check - fails when KeywordClassifier or _ReasoningIndex
+answers differently from the substring scans they replaced.
+
+Usage:
+    python check_classifier.py [--random 20000] [--seed 11] [--json]
+
+KeywordClassifier.best()/first()/counts() are compared with the old
+`kw in text.lower()` scans over DOMAIN_KEYWORDS, PAGE_TYPE_KEYWORDS and
+LAYOUT_KEYWORDS, on every cell of every shipped CSV plus random texts
+built from keyword fragments, noise, casing and Unicode whose lowercase
+changes length. _ReasoningIndex.find() is compared with the old
+three-pass rule lookup (exact, substring, keyword) on the shipped rules,
+reordered rules, a rule with an empty category and no rules. Exit code 1
+on any mismatch.
+"""
+
+import csv
+import json
+import random
+import sys
+
+import core
+import design_system
+
+# ============ CONFIGURATION ============
+RANDOM_TEXTS = 20000
+RANDOM_CATEGORIES = 5000
+SEED = 11
+NOISE = "abcdeghilmnorstuy #-.İẞ404 "
+
+
+# ============ BASELINE ============
+def _old_counts(table, text):
+    text_lower = text.lower()
+    return {label: sum(1 for kw in keywords if kw in text_lower) for label, keywords in table.items()}
+
+
+def _old_best(table, text, default):
+    scores = _old_counts(table, text)
+    best = max(scores, key=scores.get)
+    return best if scores[best] > 0 else default
+
+
+def _old_first(table, text):
+    text_lower = text.lower()
+    return next((label for label, keywords in table.items() if any(kw in text_lower for kw in keywords)), None)
+
+
+def _old_find_rule(rules, category):
+    """The original three-pass reasoning rule lookup"""
+    category_lower = category.lower()
+    for rule in rules:
+        if rule.get("UI_Category", "").lower() == category_lower:
+            return rule
+    for rule in rules:
+        ui_cat = rule.get("UI_Category", "").lower()
+        if ui_cat in category_lower or category_lower in ui_cat:
+            return rule
+    for rule in rules:
+        ui_cat = rule.get("UI_Category", "").lower()
+        keywords = ui_cat.replace("/", " ").replace("-", " ").split()
+        if any(kw in category_lower for kw in keywords):
+            return rule
+    return {}
+
+
+# ============ CHECKS ============
+def _shipped_cells():
+    cells = []
+    for filepath, _, _ in core._index_sources():
+        if filepath.exists():
+            cells += [value for row in core._parse_csv(filepath.read_bytes()) for value in row.values()
+                      if isinstance(value, str)]
+    return cells
+
+
+def check_classifiers(random_texts=RANDOM_TEXTS, seed=SEED):
+    """best()/first()/counts() of each table's classifier against the old scans"""
+    rng = random.Random(seed)
+    tables = {
+        "DOMAIN_KEYWORDS": core.DOMAIN_KEYWORDS,
+        "PAGE_TYPE_KEYWORDS": design_system.PAGE_TYPE_KEYWORDS,
+        "LAYOUT_KEYWORDS": design_system.LAYOUT_KEYWORDS
+    }
+    fragments = [kw for table in tables.values() for keywords in table.values() for kw in keywords]
+    texts = _shipped_cells()
+    for _ in range(random_texts):
+        parts = [rng.choice(fragments) if rng.random() < 0.5 else "".join(rng.choices(NOISE, k=rng.randint(0, 6)))
+                 for _ in range(rng.randint(0, 6))]
+        texts.append(("" if rng.random() < 0.5 else " ").join(part.upper() if rng.random() < 0.2 else part
+                                                             for part in parts))
+
+    failures = []
+    for name, table in tables.items():
+        classifier = core.KeywordClassifier(table)
+        for text in texts:
+            if classifier.counts(text) != _old_counts(table, text):
+                failures.append(f"{name}.counts({text!r})")
+            if classifier.best(text, "style") != _old_best(table, text, "style"):
+                failures.append(f"{name}.best({text!r})")
+            if classifier.first(text) != _old_first(table, text):
+                failures.append(f"{name}.first({text!r})")
+    for text in texts:
+        if core.detect_domain(text) != _old_best(core.DOMAIN_KEYWORDS, text, "style"):
+            failures.append(f"detect_domain({text!r})")
+    return {"check": "classifier", "cases": len(texts) * (len(tables) * 3 + 1), "failures": failures}
+
+
+def check_reasoning(random_categories=RANDOM_CATEGORIES, seed=SEED):
+    """_ReasoningIndex.find() against the old three-pass lookup"""
+    rng = random.Random(seed)
+    with open(design_system.DATA_DIR / design_system.REASONING_FILE, encoding="utf-8") as f:
+        rules = list(csv.DictReader(f))
+    names = [rule["UI_Category"] for rule in rules]
+    words = sorted({word for name in names for word in name.replace("/", " ").replace("-", " ").split()})
+    categories = names + [name.upper() for name in names] + ["", "\0", "zzz", "SaaS", "a"]
+    for name in names:
+        for _ in range(5):
+            start = rng.randint(0, len(name))
+            categories.append(name[start:rng.randint(start, len(name))])
+    for _ in range(random_categories):
+        categories.append(" ".join(rng.choice(words + ["foo", "x", "/", "-", "app"]) for _ in range(rng.randint(1, 4))))
+    categories += [row.get("Product Type", "") for row in core._parse_csv((core.DATA_DIR / "products.csv").read_bytes())]
+
+    rule_sets = {
+        "shipped": rules,
+        "reversed": rules[::-1],
+        "empty-category": rules[:10] + [dict(rules[0], UI_Category="")] + rules[10:] if rules else [],
+        "no-rules": []
+    }
+    failures = []
+    for name, rule_set in rule_sets.items():
+        index = design_system._ReasoningIndex(rule_set)
+        for category in categories:
+            idx = index.find(category)
+            old = _old_find_rule(rule_set, category)
+            if not (idx is None and old == {} or idx is not None and rule_set[idx] is old):
+                failures.append(f"{name}: find({category!r}) = {idx}")
+    generator = design_system.DesignSystemGenerator()
+    for category in categories:
+        if generator._find_reasoning_rule(category) != _old_find_rule(rules, category):
+            failures.append(f"_find_reasoning_rule({category!r})")
+    return {"check": "reasoning", "cases": len(categories) * (len(rule_sets) + 1), "failures": failures}
+
+
+# ============ CLI SUPPORT ============
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check keyword classifiers and reasoning lookup against the old scans")
+    parser.add_argument("--random", type=int, default=RANDOM_TEXTS, help=f"Random texts (default: {RANDOM_TEXTS})")
+    parser.add_argument("--seed", type=int, default=SEED, help=f"Random seed (default: {SEED})")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+
+    args = parser.parse_args()
+
+    reports = [check_classifiers(args.random, args.seed), check_reasoning(RANDOM_CATEGORIES, args.seed)]
+    for report in reports:
+        report["ok"] = not report["failures"]
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            status = "OK" if report["ok"] else "FAIL"
+            print(f"{status}: {report['check']}: {report['cases']} cases")
+            for failure in report["failures"][:20]:
+                print(f"  {failure}")
+    sys.exit(0 if all(report["ok"] for report in reports) else 1)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incremental Index Check - fails when row deltas applied by
+refresh_indices() leave an index different from a full refit.
+
+Usage:
+    python check_incremental.py [--modes python,python-nocache,sparse] [--rounds 6] [--seed 7] [--json]
+
+Copies the shipped CSVs into a scratch data directory (with a scratch
+index cache), loads and watches every domain/stack index, then applies
+random row inserts, updates and removals for a number of rounds. After
+each round refresh_indices() applies the edits as deltas, and every
+resident index is compared with _build_index(..., cache=False) of the
+edited CSV on postings, idf, doc_lengths, avgdl, rows and top_k results
+for a seeded query set. Exit code 1 on any mismatch.
+
+Modes: python (mapped index cache on), python-nocache, sparse (skipped
+when numpy/scipy are missing).
+"""
+
+import csv
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import core
+
+# ============ CONFIGURATION ============
+MODES = ["python", "python-nocache", "sparse"]
+ROUNDS = 6
+SEED = 7
+EDITS_PER_FILE = 4
+QUERIES_PER_SOURCE = 12
+TOP_K = 5
+TOLERANCE = 1e-9
+FIXED_QUERIES = ["glassmorphism dark", "minimal clean saas", "accessibility animation", "form validation error"]
+
+
+def _close(a, b):
+    return abs(a - b) <= TOLERANCE * max(1.0, abs(a), abs(b))
+
+
+def _postings(bm25):
+    """{term: [(doc id, tf), ...]}, independent of term id order"""
+    offsets, doc_ids, tfs = bm25.offsets, bm25.doc_ids, bm25.tfs
+    return {term: list(zip(doc_ids[offsets[tid]:offsets[tid + 1]], tfs[offsets[tid]:offsets[tid + 1]]))
+            for term, tid in bm25.terms.items()}
+
+
+def compare_indices(actual, expected, queries):
+    """Differences (strings) between an incrementally updated and a refitted _SearchIndex"""
+    problems = []
+    a, e = actual.bm25, expected.bm25
+    if _postings(a) != _postings(e):
+        problems.append("postings differ")
+    idf_a = {term: a.idf[tid] for term, tid in a.terms.items()}
+    idf_e = {term: e.idf[tid] for term, tid in e.terms.items()}
+    if idf_a.keys() != idf_e.keys() or not all(_close(idf_a[term], idf_e[term]) for term in idf_e):
+        problems.append("idf differs")
+    if list(a.doc_lengths) != list(e.doc_lengths):
+        problems.append("doc_lengths differ")
+    if a.N != e.N or not _close(a.avgdl, e.avgdl):
+        problems.append(f"N/avgdl differ: {a.N}/{a.avgdl} vs {e.N}/{e.avgdl}")
+    if [actual.rows[i] for i in range(len(actual.rows))] != [expected.rows[i] for i in range(len(expected.rows))]:
+        problems.append("rows differ")
+    for query in queries:
+        got, want = a.top_k(query, TOP_K), e.top_k(query, TOP_K)
+        if [idx for idx, _ in got] != [idx for idx, _ in want] or \
+                not all(_close(x, y) for (_, x), (_, y) in zip(got, want)):
+            problems.append(f"top_k({query!r}) differs: {got} vs {want}")
+    return problems
+
+
+def _edit_csv(path, rng, vocabulary, round_number):
+    """Apply random inserts, updates and removals to a CSV; returns the edit counts"""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        rows = list(reader)
+    counts = {"insert": 0, "update": 0, "remove": 0}
+    for _ in range(EDITS_PER_FILE):
+        op = rng.choice(["insert", "update", "remove"] if len(rows) > 1 else ["insert"])
+        if op == "insert":
+            row = {col: rng.choice(rows)[col] if rows else "" for col in fieldnames}
+            row[rng.choice(fieldnames)] = " ".join(rng.sample(vocabulary, min(3, len(vocabulary))))
+            rows.insert(rng.randint(0, len(rows)), row)
+        elif op == "update":
+            idx = rng.randrange(len(rows))
+            col = rng.choice(fieldnames)
+            rows[idx] = dict(rows[idx], **{col: f"{rows[idx][col]} {rng.choice(vocabulary)} edited{round_number}"})
+        else:
+            del rows[rng.randrange(len(rows))]
+        counts[op] += 1
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    # Distinct mtime per round, so a same-size rewrite still changes the signature
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + round_number + 1))
+    return counts
+
+
+def _source_queries(index, rng):
+    terms = list(index.bm25.terms)
+    queries = list(FIXED_QUERIES)
+    for _ in range(QUERIES_PER_SOURCE):
+        queries.append(" ".join(rng.sample(terms, min(len(terms), rng.randint(1, 3)))))
+    return queries
+
+
+def check_mode(mode, rounds=ROUNDS, seed=SEED):
+    """Edit scratch copies of the CSVs for `rounds` rounds, comparing deltas with refits"""
+    backend = "sparse" if mode == "sparse" else "python"
+    if core._resolve_backend(backend) != backend:
+        return {"mode": mode, "skipped": "numpy/scipy not installed", "ok": True}
+
+    saved = (core.DATA_DIR, core.INDEX_CACHE_DIR, core.INDEX_CACHE_ENABLED)
+    rng = random.Random(seed)
+    failures = []
+    compared = 0
+    deltas = 0
+    edits = {"insert": 0, "update": 0, "remove": 0}
+    with tempfile.TemporaryDirectory() as scratch:
+        core.DATA_DIR = Path(scratch) / "data"
+        core.INDEX_CACHE_DIR = Path(scratch) / "cache"
+        core.INDEX_CACHE_ENABLED = mode != "python-nocache"
+        shutil.copytree(saved[0], core.DATA_DIR)
+        core.clear_index_registry()
+        try:
+            core.watch_indices(backend)
+            for round_number in range(rounds):
+                for key, index in list(core._INDEX_REGISTRY.items()):
+                    if rng.random() < 0.75:
+                        vocabulary = list(index.bm25.terms) or ["word"]
+                        for op, count in _edit_csv(Path(key[0]), rng, vocabulary, round_number).items():
+                            edits[op] += count
+                core.refresh_indices()
+                for key, index in core._INDEX_REGISTRY.items():
+                    filepath = Path(key[0])
+                    expected = core._build_index(filepath, list(key[1]), list(key[2]), core._file_signature(filepath),
+                                                 backend=backend, cache=False)
+                    compared += 1
+                    for problem in compare_indices(index, expected, _source_queries(expected, rng)):
+                        failures.append(f"round {round_number} {filepath.name}: {problem}")
+            deltas = core.index_stats()["deltas"]
+        finally:
+            core.clear_index_registry()
+            core.DATA_DIR, core.INDEX_CACHE_DIR, core.INDEX_CACHE_ENABLED = saved
+    return {
+        "mode": mode,
+        "rounds": rounds,
+        "edits": edits,
+        "indices_compared": compared,
+        "deltas_applied": deltas,
+        "failures": failures,
+        "ok": not failures
+    }
+
+
+# ============ CLI SUPPORT ============
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check incremental index updates against full refits")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Comma-separated modes (default: {','.join(MODES)})")
+    parser.add_argument("--rounds", type=int, default=ROUNDS, help=f"Edit rounds per mode (default: {ROUNDS})")
+    parser.add_argument("--seed", type=int, default=SEED, help=f"Random seed (default: {SEED})")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+
+    args = parser.parse_args()
+
+    reports = [check_mode(mode.strip(), args.rounds, args.seed) for mode in args.modes.split(",") if mode.strip()]
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            if "skipped" in report:
+                print(f"SKIP: {report['mode']} ({report['skipped']})")
+                continue
+            status = "OK" if report["ok"] else "FAIL"
+            print(f"{status}: {report['mode']}: {report['indices_compared']} indices compared over "
+                  f"{report['rounds']} rounds ({report['edits']['insert']} inserts, {report['edits']['update']} updates, "
+                  f"{report['edits']['remove']} removals, {report['deltas_applied']} deltas applied)")
+            for failure in report["failures"][:20]:
+                print(f"  {failure}")
+    sys.exit(0 if all(report["ok"] for report in reports) else 1)
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ranking Parity Check - fails when the BM25 engine ranks any shipped CSV
+differently from the original exhaustive scorer.
+
+Usage:
+    python check_parity.py [--modes python,python-cache,sparse,sparse-cache] [--seed 1] [--json]
+
+For every CSV_CONFIG domain and STACK_CONFIG stack, and a fixed plus a
+seeded sampled query set, the index served by get_index() is compared
+with _BaselineBM25 (the scorer the posting-list engine replaced, kept
+verbatim):
+    score      full ranking; identical in python modes, per-document
+               scores within TOLERANCE for sparse
+    top_k      k = 1, 3, 10, 50 against the baseline's first k positive
+               scores; rank-identical in python modes, identical up to
+               ties within TOLERANCE for sparse
+    search     _search_csv() output rows against the baseline's
+               projection (python modes)
+
+*-cache modes build every index into a scratch cache first and then
+query the reopened (memory-mapped) files. sparse modes are skipped when
+numpy/scipy are missing. Exit code 1 on any mismatch.
+"""
+
+import csv
+import json
+import random
+import re
+import sys
+import tempfile
+from collections import defaultdict
+from math import log
+from pathlib import Path
+
+import core
+
+# ============ CONFIGURATION ============
+MODES = ["python", "python-cache", "sparse", "sparse-cache"]
+SEED = 1
+SAMPLED_QUERIES = 30
+TOP_KS = [1, 3, 10, 50]
+TOLERANCE = 1e-9
+FIXED_QUERIES = [
+    "saas dashboard", "glassmorphism dark mode", "elegant luxury serif", "animation accessibility button button",
+    "hero social-proof pricing", "real-time trend chart", "beauty spa wellness service", "fintech crypto",
+    "react suspense waterfall bundle", "aria focus keyboard", "form input validation", "state hooks performance",
+    "navigation list", "the and for", "", "zzzz unknown", "color colors colour"
+]
+
+
+# ============ BASELINE ============
+class _BaselineBM25:
+    """The original exhaustive BM25 scorer (every document, full sort)"""
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.corpus = []
+        self.doc_lengths = []
+        self.avgdl = 0
+        self.idf = {}
+        self.doc_freqs = defaultdict(int)
+        self.N = 0
+
+    def tokenize(self, text):
+        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
+        return [w for w in text.split() if len(w) > 2]
+
+    def fit(self, documents):
+        self.corpus = [self.tokenize(doc) for doc in documents]
+        self.N = len(self.corpus)
+        if self.N == 0:
+            return
+        self.doc_lengths = [len(doc) for doc in self.corpus]
+        self.avgdl = sum(self.doc_lengths) / self.N
+
+        for doc in self.corpus:
+            seen = set()
+            for word in doc:
+                if word not in seen:
+                    self.doc_freqs[word] += 1
+                    seen.add(word)
+
+        for word, freq in self.doc_freqs.items():
+            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+
+    def score(self, query):
+        query_tokens = self.tokenize(query)
+        scores = []
+
+        for idx, doc in enumerate(self.corpus):
+            score = 0
+            doc_len = self.doc_lengths[idx]
+            term_freqs = defaultdict(int)
+            for word in doc:
+                term_freqs[word] += 1
+
+            for token in query_tokens:
+                if token in self.idf:
+                    tf = term_freqs[token]
+                    idf = self.idf[token]
+                    numerator = tf * (self.k1 + 1)
+                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
+                    score += idf * numerator / denominator
+
+            scores.append((idx, score))
+
+        return sorted(scores, key=lambda x: x[1], reverse=True)
+
+
+# ============ COMPARISON ============
+def _close(a, b):
+    return abs(a - b) <= TOLERANCE * max(1.0, abs(a), abs(b))
+
+
+def _same_ranking(got, expected, baseline_scores, exact):
+    """got/expected are [(idx, score)]; inexact rankings may swap documents whose scores tie"""
+    if exact:
+        return got == expected
+    return len(got) == len(expected) and all(
+        _close(score, want) and (idx == want_idx or _close(baseline_scores[idx], want))
+        for (idx, score), (want_idx, want) in zip(got, expected)
+    )
+
+
+def _queries(baseline, rng):
+    words = sorted({word for doc in baseline.corpus for word in doc})
+    sampled = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 6))) for _ in range(SAMPLED_QUERIES)] if words else []
+    return FIXED_QUERIES + sampled
+
+
+def check_source(filepath, search_cols, output_cols, backend, exact, rng):
+    """(cases compared, failures) for one CSV"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        data = list(csv.DictReader(f))
+    baseline = _BaselineBM25()
+    baseline.fit([" ".join(str(row.get(col, "")) for col in search_cols) for row in data])
+    bm25 = core.get_index(filepath, search_cols, output_cols, backend).bm25
+
+    cases = 0
+    failures = []
+    for query in _queries(baseline, rng):
+        ranked = baseline.score(query)
+        baseline_scores = dict(ranked)
+        scores = bm25.score(query)
+        cases += 1
+        if exact and scores != ranked or not exact and (
+                len(scores) != len(ranked) or not all(_close(score, baseline_scores[idx]) for idx, score in scores)):
+            failures.append(f"{filepath.name}: score({query!r}) differs")
+        for k in TOP_KS:
+            expected = [(idx, score) for idx, score in ranked[:k] if score > 0]
+            got = bm25.top_k(query, k)
+            cases += 1
+            if not _same_ranking(got, expected, baseline_scores, exact):
+                failures.append(f"{filepath.name}: top_k({query!r}, {k}) = {got}, baseline {expected}")
+            if exact:
+                rows = [{col: data[idx].get(col, "") for col in output_cols if col in data[idx]} for idx, _ in expected]
+                cases += 1
+                if core._search_csv(filepath, search_cols, output_cols, query, k, backend) != rows:
+                    failures.append(f"{filepath.name}: search({query!r}, {k}) rows differ")
+    return cases, failures
+
+
+def check_mode(mode, seed=SEED):
+    """Compare every shipped source with the baseline under one backend/cache mode"""
+    backend = mode.split("-")[0]
+    if core._resolve_backend(backend) != backend:
+        return {"mode": mode, "skipped": "numpy/scipy not installed", "ok": True}
+
+    saved = (core.INDEX_CACHE_DIR, core.INDEX_CACHE_ENABLED)
+    rng = random.Random(seed)
+    sources = [source for source in core._index_sources() if source[0].exists()]
+    cases = 0
+    failures = []
+    index_types = set()
+    with tempfile.TemporaryDirectory() as scratch:
+        core.INDEX_CACHE_DIR = Path(scratch)
+        core.INDEX_CACHE_ENABLED = mode.endswith("-cache")
+        core.clear_index_registry()
+        core.clear_result_cache()
+        try:
+            if core.INDEX_CACHE_ENABLED:
+                for filepath, search_cols, output_cols in sources:
+                    core.get_index(filepath, search_cols, output_cols, backend)
+                core.clear_index_registry()  # query the reopened cache files, not the fitted indices
+            for filepath, search_cols, output_cols in sources:
+                source_cases, source_failures = check_source(filepath, search_cols, output_cols, backend,
+                                                             backend == "python", rng)
+                index_types.add(type(core.get_index(filepath, search_cols, output_cols, backend).bm25).__name__)
+                cases += source_cases
+                failures += source_failures
+        finally:
+            core.clear_index_registry()
+            core.clear_result_cache()
+            core.INDEX_CACHE_DIR, core.INDEX_CACHE_ENABLED = saved
+    return {
+        "mode": mode,
+        "sources": len(sources),
+        "index_types": sorted(index_types),
+        "cases": cases,
+        "failures": failures,
+        "ok": not failures
+    }
+
+
+# ============ CLI SUPPORT ============
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check BM25 rankings against the original exhaustive scorer")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Comma-separated modes (default: {','.join(MODES)})")
+    parser.add_argument("--seed", type=int, default=SEED, help=f"Query sampling seed (default: {SEED})")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+
+    args = parser.parse_args()
+
+    reports = [check_mode(mode.strip(), args.seed) for mode in args.modes.split(",") if mode.strip()]
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            if "skipped" in report:
+                print(f"SKIP: {report['mode']} ({report['skipped']})")
+                continue
+            status = "OK" if report["ok"] else "FAIL"
+            print(f"{status}: {report['mode']}: {report['cases']} cases over {report['sources']} sources "
+                  f"({', '.join(report['index_types'])})")
+            for failure in report["failures"][:20]:
+                print(f"  {failure}")
+    sys.exit(0 if all(report["ok"] for report in reports) else 1)
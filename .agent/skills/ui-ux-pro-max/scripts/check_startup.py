@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Startup Budget Check - fails when importing search.py gets too slow or
+starts pulling heavy modules onto the plain-search path.
+
+Usage:
+    python check_startup.py [--budget-ms 35] [--runs 5] [--json]
+
+Runs `python -X importtime -c "import search"` in fresh interpreters and
+takes the best cumulative import time of the `search` module. Exit code
+1 means the budget was exceeded or a deferred module was imported.
+"""
+
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+# ============ CONFIGURATION ============
+SCRIPTS_DIR = Path(__file__).parent
+BUDGET_MS = 35.0
+RUNS = 5
+
+# Modules that must only load on the code paths that need them
+DEFERRED_MODULES = ["design_system", "socketserver", "numpy", "scipy", "csv", "hashlib"]
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\| ( *)(\S+)\s*$")
+
+
+def measure_import(module="search"):
+    """Import module in a fresh interpreter; return (cumulative_ms, imported module names)"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True
+    )
+    cumulative_ms = None
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        modules.append(match.group(4))
+        if match.group(4) == module and not match.group(3):
+            cumulative_ms = int(match.group(2)) / 1000
+    return cumulative_ms, modules
+
+
+def check_startup(budget_ms=BUDGET_MS, runs=RUNS):
+    """Best-of-N import time of search.py against the budget"""
+    measure_import()  # warm-up: writes bytecode caches
+    timings = []
+    modules = []
+    for _ in range(runs):
+        cumulative_ms, modules = measure_import()
+        timings.append(cumulative_ms)
+    best = min(timings)
+    loaded = sorted({name.split(".")[0] for name in modules} & set(DEFERRED_MODULES))
+    return {
+        "module": "search",
+        "budget_ms": budget_ms,
+        "best_ms": round(best, 2),
+        "timings_ms": [round(t, 2) for t in timings],
+        "deferred_modules_loaded": loaded,
+        "ok": best <= budget_ms and not loaded
+    }
+
+
+# ============ CLI SUPPORT ============
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check search.py import-time budget")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS, help=f"Max cumulative import time (default: {BUDGET_MS})")
+    parser.add_argument("--runs", type=int, default=RUNS, help=f"Fresh interpreters to sample (default: {RUNS})")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+
+    args = parser.parse_args()
+
+    report = check_startup(args.budget_ms, args.runs)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        status = "OK" if report["ok"] else "FAIL"
+        print(f"{status}: import search took {report['best_ms']}ms (budget {report['budget_ms']}ms)")
+        if report["deferred_modules_loaded"]:
+            print(f"  Deferred modules imported eagerly: {', '.join(report['deferred_modules_loaded'])}")
+    sys.exit(0 if report["ok"] else 1)
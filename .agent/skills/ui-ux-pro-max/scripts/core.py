@@ -4,16 +4,49 @@
 UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
-import csv
+import heapq
+import json
+import os
 import re
+import sys
+import threading
+from array import array
 from pathlib import Path
+from bisect import bisect_left
+from itertools import accumulate
 from math import log
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from functools import partial, wraps
+from time import perf_counter_ns
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
 MAX_RESULTS = 3
 
+# On-disk index cache (set UIPRO_CACHE_DIR to relocate, UIPRO_INDEX_CACHE=0 to disable)
+INDEX_CACHE_DIR = Path(os.environ.get("UIPRO_CACHE_DIR") or Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "ui-ux-pro-max")
+INDEX_CACHE_ENABLED = os.environ.get("UIPRO_INDEX_CACHE", "1") != "0"
+INDEX_FORMAT_VERSION = 5
+TOKENIZER_VERSION = 1
+
+# Query result cache (UIPRO_RESULT_CACHE_SIZE=0 disables; UIPRO_RESULT_CACHE_DB
+# points at an SQLite file shared by every CLI process)
+RESULT_CACHE_SIZE = int(os.environ.get("UIPRO_RESULT_CACHE_SIZE", "512"))
+RESULT_CACHE_DB = os.environ.get("UIPRO_RESULT_CACHE_DB") or None
+RESULT_CACHE_DB_ROWS = 50000
+# Independently locked LRU segments, so concurrent searches rarely contend
+RESULT_CACHE_STRIPES = 16
+
+# Index builds: CSVs of at least BUILD_PARALLEL_MIN_BYTES are tokenized by
+# UIPRO_BUILD_WORKERS processes, BUILD_CHUNK_ROWS rows per task
+BUILD_WORKERS = int(os.environ.get("UIPRO_BUILD_WORKERS", "1"))
+BUILD_CHUNK_ROWS = 20000
+BUILD_PARALLEL_MIN_BYTES = 16 * 1024 * 1024
+
+# Scoring backends: "python" (pure-Python BM25) or "sparse" (numpy/scipy, falls back to python)
+DEFAULT_BACKEND = "python"
+
+# "file" is relative to DATA_DIR; an absolute path points a domain at an external corpus
 CSV_CONFIG = {
     "style": {
         "file": "styles.csv",
@@ -92,124 +125,1858 @@ _STACK_COLS = {
 AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 
 
+# ============ PROFILING ============
+# Stage timings, collected only between enable_profiling() and
+# disable_profiling(); while disabled, span() hands out one shared no-op
+# context manager and profiled() functions pay a single None check. Per-query
+# paths use profiled() only: the no-op span still costs ~0.3 us.
+_PROFILE = None  # stage name -> [calls, total_ns, max_ns]
+_PROFILE_START = 0
+_PROFILE_LOCK = threading.Lock()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = perf_counter_ns() - self.start
+        with _PROFILE_LOCK:
+            if _PROFILE is not None:
+                stage = _PROFILE.get(self.name)
+                if stage is None:
+                    _PROFILE[self.name] = [1, elapsed, elapsed]
+                else:
+                    stage[0] += 1
+                    stage[1] += elapsed
+                    stage[2] = max(stage[2], elapsed)
+        return False
+
+
+def span(name):
+    """Context manager timing one stage (inclusive of nested stages)"""
+    return _NULL_SPAN if _PROFILE is None else _Span(name)
+
+
+def profiled(name):
+    """Decorator: time every call of the function as stage `name`"""
+    def decorate(function):
+        @wraps(function)
+        def timed(*args, **kwargs):
+            if _PROFILE is None:
+                return function(*args, **kwargs)
+            with _Span(name):
+                return function(*args, **kwargs)
+        return timed
+    return decorate
+
+
+def enable_profiling():
+    """Start (or restart) collecting stage timings in this process"""
+    global _PROFILE, _PROFILE_START
+    with _PROFILE_LOCK:
+        _PROFILE = {}
+        _PROFILE_START = perf_counter_ns()
+
+
+def disable_profiling():
+    global _PROFILE
+    with _PROFILE_LOCK:
+        _PROFILE = None
+
+
+def profile_report():
+    """Per-stage calls/total/mean/max since enable_profiling(), slowest total first.
+
+    Stages nest (e.g. bm25.fit runs inside index.build), so totals are
+    inclusive and do not sum to wall_ms.
+    """
+    with _PROFILE_LOCK:
+        stages = dict((name, list(stage)) for name, stage in (_PROFILE or {}).items())
+        wall_ns = perf_counter_ns() - _PROFILE_START if _PROFILE is not None else 0
+    return {
+        "wall_ms": round(wall_ns / 1e6, 3),
+        "stages": {
+            name: {
+                "calls": calls,
+                "total_ms": round(total / 1e6, 3),
+                "mean_us": round(total / calls / 1e3, 1),
+                "max_us": round(longest / 1e3, 1)
+            }
+            for name, (calls, total, longest) in sorted(stages.items(), key=lambda item: -item[1][1])
+        }
+    }
+
+
 # ============ BM25 IMPLEMENTATION ============
 class BM25:
-    """BM25 ranking algorithm for text search"""
+    """BM25 ranking algorithm for text search.
+
+    Posting lists are packed into flat arrays: term id t owns
+    doc_ids/tfs[offsets[t]:offsets[t + 1]] in ascending doc id order, and
+    idf/upper_bounds are indexed by term id. `terms` maps each (interned)
+    term to its id.
+
+    Queries only read these arrays, so a fitted index can be shared by any
+    number of threads. Fitting and edits mutate in place: registered
+    indices are only ever edited through copy() (see _apply_row_deltas).
+    """
+
+    backend = "python"
+    __slots__ = ("k1", "b", "terms", "offsets", "doc_ids", "tfs", "upper_bounds", "doc_lengths", "avgdl", "idf", "N", "_edits")
 
     def __init__(self, k1=1.5, b=0.75):
         self.k1 = k1
         self.b = b
-        self.corpus = []
-        self.doc_lengths = []
+        self.terms = {}
+        self.offsets = array("I", [0])
+        self.doc_ids = array("I")
+        self.tfs = array("I")
+        self.upper_bounds = array("d")
+        self.doc_lengths = array("I")
         self.avgdl = 0
-        self.idf = {}
-        self.doc_freqs = defaultdict(int)
+        self.idf = array("d")
         self.N = 0
+        # Unpacked {term: ([doc ids], [tfs])} while incremental edits are pending
+        self._edits = None
 
     def tokenize(self, text):
         """Lowercase, split, remove punctuation, filter short words"""
         text = re.sub(r'[^\w\s]', ' ', str(text).lower())
         return [w for w in text.split() if len(w) > 2]
 
-    def fit(self, documents):
-        """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
+    def fit(self, documents, workers=1):
+        """Build BM25 index from documents.
+
+        Each term gets a posting list of (doc ids, term frequencies) in
+        ascending doc id order, so scoring only visits matching documents.
+        Documents are consumed one at a time, so a generator over a large
+        CSV is never materialized. With workers > 1, chunks are tokenized
+        in a process pool and merged in order (same result as serial).
+        """
+        with span("bm25.fit"):
+            # Streamed input: reading the CSV is timed as part of tokenizing
+            with span("bm25.tokenize"):
+                if workers > 1:
+                    postings, self.doc_lengths = _fit_parallel(type(self), documents, workers)
+                else:
+                    postings, self.doc_lengths = _chunk_postings(self.tokenize, documents)
+            self.N = len(self.doc_lengths)
+            with span("bm25.pack"):
+                self._pack(postings)
+            if self.N == 0:
+                return
+
+            with span("bm25.stats"):
+                self.refresh_stats()
+
+    def _pack(self, postings):
+        """Pack {term: (doc ids, tfs)} into the flat arrays; empty terms are dropped"""
+        self.terms = {}
+        self.offsets = array("I", [0])
+        self.doc_ids = array("I")
+        self.tfs = array("I")
+        for word, (doc_ids, tfs) in postings.items():
+            if doc_ids:
+                self.terms[sys.intern(word)] = len(self.terms)
+                self.doc_ids.extend(doc_ids)
+                self.tfs.extend(tfs)
+                self.offsets.append(len(self.doc_ids))
+
+    def _unpack(self):
+        offsets = self.offsets
+        return {
+            word: (self.doc_ids[offsets[t]:offsets[t + 1]].tolist(), self.tfs[offsets[t]:offsets[t + 1]].tolist())
+            for word, t in self.terms.items()
+        }
+
+    @staticmethod
+    def _term_counts(tokens):
+        term_freqs = defaultdict(int)
+        for word in tokens:
+            term_freqs[word] += 1
+        return term_freqs
+
+    def refresh_stats(self):
+        """Recompute avgdl, idf and score upper bounds from doc_lengths/posting lists.
+
+        Cheap relative to fit(): nothing is re-tokenized. Called after
+        incremental edits, which change N and avgdl for every term.
+        """
+        if self._edits is not None:
+            self._pack(self._edits)
+            self._edits = None
         if self.N == 0:
+            self.avgdl = 0
+            self.idf = array("d", [0.0]) * len(self.terms)
+            self.upper_bounds = array("d", self.idf)
             return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
         self.avgdl = sum(self.doc_lengths) / self.N
+        offsets = self.offsets
+        self.idf = array("d", [
+            log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+            for freq in (offsets[t + 1] - offsets[t] for t in range(len(self.terms)))
+        ])
+        self._compute_upper_bounds()
+
+    # ---- Incremental updates ----
+    # Edits work on an unpacked copy of the posting lists, which is packed
+    # again by refresh_stats(); with refresh=False a batch of edits pays
+    # for that only once.
+    def _postings_for_edit(self):
+        if self._edits is None:
+            self._edits = self._unpack()
+        return self._edits
+
+    def _unindex(self, idx):
+        """Drop doc idx from every posting list (ids are not renumbered)"""
+        postings = self._postings_for_edit()
+        for word in list(postings):
+            doc_ids, tfs = postings[word]
+            pos = bisect_left(doc_ids, idx)
+            if pos < len(doc_ids) and doc_ids[pos] == idx:
+                del doc_ids[pos]
+                del tfs[pos]
+                if not doc_ids:
+                    del postings[word]
+
+    def _index(self, idx, tokens):
+        """Insert doc idx into the posting lists of its terms"""
+        postings = self._postings_for_edit()
+        for word, tf in self._term_counts(tokens).items():
+            lists = postings.get(word)
+            if lists is None:
+                lists = postings[word] = ([], [])
+            pos = bisect_left(lists[0], idx)
+            lists[0].insert(pos, idx)
+            lists[1].insert(pos, tf)
+
+    def _shift(self, start, delta):
+        """Renumber every doc id >= start by delta"""
+        for doc_ids, _ in self._postings_for_edit().values():
+            for pos in range(bisect_left(doc_ids, start), len(doc_ids)):
+                doc_ids[pos] += delta
 
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
+    def insert_document(self, idx, document, refresh=True):
+        """Insert a document at position idx, shifting later documents down"""
+        tokens = self.tokenize(document)
+        self._shift(idx, 1)
+        self.doc_lengths.insert(idx, len(tokens))
+        self._index(idx, tokens)
+        self.N += 1
+        if refresh:
+            self.refresh_stats()
+        return idx
 
-        for word, freq in self.doc_freqs.items():
-            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+    def add_document(self, document, refresh=True):
+        """Append a document; returns its idx"""
+        return self.insert_document(self.N, document, refresh)
 
+    def update_document(self, idx, document, refresh=True):
+        """Replace the text of document idx"""
+        tokens = self.tokenize(document)
+        self._unindex(idx)
+        self.doc_lengths[idx] = len(tokens)
+        self._index(idx, tokens)
+        if refresh:
+            self.refresh_stats()
+
+    def remove_document(self, idx, refresh=True):
+        """Delete document idx, shifting later documents up"""
+        self._unindex(idx)
+        self._shift(idx + 1, -1)
+        del self.doc_lengths[idx]
+        self.N -= 1
+        if refresh:
+            self.refresh_stats()
+
+    def copy(self):
+        """Independent copy, so edits never touch an index other threads are reading"""
+        clone = self.__class__.__new__(self.__class__)
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                setattr(clone, name, getattr(self, name))
+        clone.terms = dict(self.terms)
+        for name in ("offsets", "doc_ids", "tfs", "doc_lengths", "idf", "upper_bounds"):
+            setattr(clone, name, array(getattr(self, name).typecode, getattr(self, name)))
+        if self._edits is not None:
+            clone._edits = {word: (list(doc_ids), list(tfs)) for word, (doc_ids, tfs) in self._edits.items()}
+        return clone
+
+    def _compute_upper_bounds(self):
+        """Max single-document score contribution of each term (for top_k pruning)"""
+        k1 = self.k1
+        b = self.b
+        doc_lengths = self.doc_lengths
+        doc_ids = self.doc_ids
+        tfs = self.tfs
+        offsets = self.offsets
+        self.upper_bounds = array("d", [
+            max(idf * (tfs[pos] * (k1 + 1)) / (tfs[pos] + k1 * (1 - b + b * doc_lengths[doc_ids[pos]] / self.avgdl))
+                for pos in range(offsets[t], offsets[t + 1]))
+            for t, idf in enumerate(self.idf)
+        ])
+
+    @profiled("bm25.score")
     def score(self, query):
         """Score all documents against query"""
         query_tokens = self.tokenize(query)
-        scores = []
+        scores = [0] * self.N
+        doc_lengths = self.doc_lengths
+        doc_ids = self.doc_ids
+        tfs = self.tfs
+        k1 = self.k1
+        b = self.b
 
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
+        for token in query_tokens:
+            term_id = self.terms.get(token)
+            if term_id is None:
+                continue
+            idf = self.idf[term_id]
+            for pos in range(self.offsets[term_id], self.offsets[term_id + 1]):
+                idx = doc_ids[pos]
+                tf = tfs[pos]
+                numerator = tf * (k1 + 1)
+                denominator = tf + k1 * (1 - b + b * doc_lengths[idx] / self.avgdl)
+                scores[idx] += idf * numerator / denominator
 
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
+        return sorted(enumerate(scores), key=lambda x: x[1], reverse=True)
 
-            scores.append((idx, score))
+    def top_k(self, query, k):
+        """Return the k best (idx, score) pairs with score > 0"""
+        return self.top_k_tokens(self.tokenize(query), k)
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+    @profiled("bm25.top_k")
+    def top_k_tokens(self, query_tokens, k):
+        """top_k() for an already tokenized query.
 
+        Rank-identical to the positive-score prefix of score()[:k]. Uses
+        MaxScore pruning: query terms are ordered by score upper bound, and
+        once k results are held, terms whose cumulative bound cannot beat
+        the k-th score become non-essential. Only documents from essential
+        posting lists are visited, and candidates whose bound falls short
+        are dropped before being fully scored.
+        """
+        query_ids = [self.terms.get(token) for token in query_tokens]
+        counts = {}
+        for term_id in query_ids:
+            if term_id is not None:
+                counts[term_id] = counts.get(term_id, 0) + 1
+        if not counts or k <= 0:
+            return []
 
-# ============ SEARCH FUNCTIONS ============
-def _load_csv(filepath):
-    """Load CSV and return list of dicts"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return list(csv.DictReader(f))
+        # Repeated query tokens add their contribution once per occurrence
+        upper_bounds = self.upper_bounds
+        terms = sorted(counts, key=lambda t: upper_bounds[t] * counts[t])
+        bounds = [upper_bounds[t] * counts[t] for t in terms]
+        cumulative = list(accumulate(bounds))
+        # Unpacked per query term: list indexing beats boxing array items in the loops below
+        offsets = self.offsets
+        lists = [(self.doc_ids[offsets[t]:offsets[t + 1]].tolist(), self.tfs[offsets[t]:offsets[t + 1]].tolist()) for t in terms]
+        idfs = [self.idf[t] for t in terms]
+        positions = [0] * len(terms)
+        num_terms = len(terms)
 
+        k1 = self.k1
+        b = self.b
+        avgdl = self.avgdl
+        doc_lengths = self.doc_lengths
+        # Bounds are summed in a different order than exact scores; the
+        # relative slack keeps float rounding from pruning a true top-k doc.
+        slack = 1 + 1e-9
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
-    """Core search function using BM25"""
-    if not filepath.exists():
-        return []
+        heap = []
+        threshold = 0.0
+        first_essential = 0
+
+        while True:
+            # Next candidate is the smallest doc id on any essential list
+            doc = -1
+            for i in range(first_essential, num_terms):
+                doc_ids = lists[i][0]
+                pos = positions[i]
+                if pos < len(doc_ids) and (doc < 0 or doc_ids[pos] < doc):
+                    doc = doc_ids[pos]
+            if doc < 0:
+                break
+
+            norm = k1 * (1 - b + b * doc_lengths[doc] / avgdl)
+            weights = {}
+            bound = cumulative[first_essential - 1] if first_essential else 0.0
+            for i in range(first_essential, num_terms):
+                doc_ids, tfs = lists[i]
+                pos = positions[i]
+                if pos < len(doc_ids) and doc_ids[pos] == doc:
+                    tf = tfs[pos]
+                    weight = idfs[i] * (tf * (k1 + 1)) / (tf + norm)
+                    weights[terms[i]] = weight
+                    bound += weight * counts[terms[i]]
+                    positions[i] = pos + 1
+
+            full = len(heap) == k
+            if full and bound * slack <= threshold:
+                continue
+
+            # Probe non-essential lists, highest bound first
+            for i in range(first_essential - 1, -1, -1):
+                doc_ids, tfs = lists[i]
+                pos = bisect_left(doc_ids, doc, positions[i])
+                positions[i] = pos
+                bound -= bounds[i]
+                if pos < len(doc_ids) and doc_ids[pos] == doc:
+                    tf = tfs[pos]
+                    weight = idfs[i] * (tf * (k1 + 1)) / (tf + norm)
+                    weights[terms[i]] = weight
+                    bound += weight * counts[terms[i]]
+                if full and bound * slack <= threshold:
+                    break
+            else:
+                # Exact score, summed in query order exactly like score()
+                score = 0
+                for term_id in query_ids:
+                    if term_id in weights:
+                        score += weights[term_id]
+                entry = (score, -doc)
+                if not full:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+
+                if len(heap) == k:
+                    threshold = heap[0][0]
+                    while first_essential < num_terms and cumulative[first_essential] * slack <= threshold:
+                        first_essential += 1
+
+        return sorted(((-neg_doc, score) for score, neg_doc in heap), key=lambda x: (-x[1], x[0]))
+
+    def get_state(self):
+        """Serializable snapshot of the fitted index"""
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "N": self.N,
+            "doc_lengths": self.doc_lengths.tolist(),
+            "terms": list(self.terms),
+            "idf": self.idf.tolist(),
+            "offsets": self.offsets.tolist(),
+            "doc_ids": self.doc_ids.tolist(),
+            "tfs": self.tfs.tolist()
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a fitted index from get_state() output without refitting"""
+        bm25 = cls(state["k1"], state["b"])
+        bm25.N = state["N"]
+        bm25.doc_lengths = array("I", state["doc_lengths"])
+        bm25.avgdl = sum(bm25.doc_lengths) / bm25.N if bm25.N else 0
+        bm25.terms = {sys.intern(word): term_id for term_id, word in enumerate(state["terms"])}
+        bm25.idf = array("d", state["idf"])
+        bm25.offsets = array("I", state["offsets"])
+        bm25.doc_ids = array("I", state["doc_ids"])
+        bm25.tfs = array("I", state["tfs"])
+        bm25._compute_upper_bounds()
+        return bm25
+
+
+def _chunk_postings(tokenize, documents):
+    """({term: (doc ids, tfs)}, doc lengths) for documents, ids counted from 0"""
+    postings = {}
+    doc_lengths = array("I")
+    for idx, doc in enumerate(documents):
+        tokens = tokenize(doc)
+        doc_lengths.append(len(tokens))
+        for word, tf in BM25._term_counts(tokens).items():
+            lists = postings.get(word)
+            if lists is None:
+                lists = postings[word] = (array("I"), array("I"))
+            lists[0].append(idx)
+            lists[1].append(tf)
+    return postings, doc_lengths
+
+
+def _index_chunk(bm25_class, documents):
+    """Process pool task: posting lists for one chunk of documents"""
+    return _chunk_postings(bm25_class().tokenize, documents)
+
+
+def _fit_parallel(bm25_class, documents, workers, chunk_rows=None):
+    """Tokenize chunks of documents in a process pool and merge them in order.
+
+    At most 2 * workers chunks are in flight, so memory stays bounded
+    while documents is streamed. Merging chunks in order keeps term
+    first-occurrence order, hence identical term ids to a serial fit.
+    """
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import islice
+
+    postings = {}
+    doc_lengths = array("I")
+
+    def merge(chunk):
+        chunk_postings, chunk_lengths = chunk
+        base = len(doc_lengths)
+        for word, (doc_ids, tfs) in chunk_postings.items():
+            lists = postings.get(word)
+            if lists is None:
+                lists = postings[word] = (array("I"), array("I"))
+            lists[0].extend(doc_id + base for doc_id in doc_ids)
+            lists[1].extend(tfs)
+        doc_lengths.extend(chunk_lengths)
+
+    documents = iter(documents)
+    chunk_rows = chunk_rows or BUILD_CHUNK_ROWS
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        while True:
+            chunk = list(islice(documents, chunk_rows))
+            if chunk:
+                pending.append(pool.submit(_index_chunk, bm25_class, chunk))
+            if not pending:
+                break
+            if not chunk or len(pending) >= 2 * workers:
+                merge(pending.popleft().result())
+    return postings, doc_lengths
+
+
+def _sparse_modules():
+    """Return (numpy, scipy.sparse), or None when they are not installed"""
+    try:
+        with span("import.sparse"):
+            import numpy
+            import scipy.sparse
+    except ImportError:
+        return None
+    return numpy, scipy.sparse
+
+
+class SparseBM25(BM25):
+    """BM25 scored as a sparse matrix product (requires numpy + scipy).
+
+    The corpus is held as a CSR document-term matrix of precomputed BM25
+    term weights, so a batch of queries is scored with one matmul. Scores
+    match BM25 within float tolerance (summation order differs). Matrix
+    columns are term ids.
+    """
+
+    backend = "sparse"
+    __slots__ = ("matrix",)
+
+    def __init__(self, k1=1.5, b=0.75):
+        super().__init__(k1, b)
+        self.matrix = None
+
+    def fit(self, documents, workers=1):
+        """Build BM25 index, then the document-term weight matrix"""
+        super().fit(documents, workers)
+        self._build_matrix()
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a fitted index from get_state() output without refitting"""
+        bm25 = super().from_state(state)
+        bm25._build_matrix()
+        return bm25
+
+    def refresh_stats(self):
+        """Recompute BM25 statistics, then the weight matrix that depends on them"""
+        super().refresh_stats()
+        self._build_matrix()
+
+    @profiled("bm25.matrix")
+    def _build_matrix(self):
+        np, sparse = _sparse_modules()
+        k1 = self.k1
+        b = self.b
+        offsets = self.offsets
+        data = [
+            idf * (self.tfs[pos] * (k1 + 1)) / (self.tfs[pos] + k1 * (1 - b + b * self.doc_lengths[self.doc_ids[pos]] / self.avgdl))
+            for t, idf in enumerate(self.idf)
+            for pos in range(offsets[t], offsets[t + 1])
+        ]
+        # The packed posting lists are already a CSC document-term matrix
+        self.matrix = sparse.csc_matrix(
+            (np.array(data, dtype=np.float64), np.array(self.doc_ids, dtype=np.int64), np.array(offsets, dtype=np.int64)),
+            shape=(self.N, len(self.terms))
+        ).tocsr()
+
+    def score_batch(self, queries):
+        """Score every document against each query; returns an N x len(queries) array"""
+        return self._score_token_lists([self.tokenize(query) for query in queries])
+
+    def _score_token_lists(self, token_lists):
+        np, sparse = _sparse_modules()
+        rows, cols = [], []
+        for col, tokens in enumerate(token_lists):
+            for token in tokens:
+                row = self.terms.get(token)
+                if row is not None:
+                    rows.append(row)
+                    cols.append(col)
+        # Duplicate (row, col) entries are summed, so repeated tokens count twice
+        query_matrix = sparse.csc_matrix(
+            (np.ones(len(rows)), (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64))),
+            shape=(len(self.terms), len(token_lists))
+        )
+        return (self.matrix @ query_matrix).toarray()
+
+    def _ranked(self, scores, k=None):
+        """(idx, score) pairs by descending score, ties by ascending idx"""
+        np, _ = _sparse_modules()
+        candidates = np.arange(len(scores)) if k is None else np.flatnonzero(scores > 0)
+        order = candidates[np.lexsort((candidates, -scores[candidates]))]
+        if k is not None:
+            order = order[:k]
+        return [(int(idx), float(scores[idx])) for idx in order]
+
+    @profiled("bm25.score")
+    def score(self, query):
+        """Score all documents against query"""
+        return self._ranked(self.score_batch([query])[:, 0])
+
+    def top_k(self, query, k):
+        """Return the k best (idx, score) pairs with score > 0"""
+        return self.top_k_batch([query], k)[0]
+
+    @profiled("bm25.top_k")
+    def top_k_tokens(self, query_tokens, k):
+        """top_k() for an already tokenized query"""
+        if k <= 0:
+            return []
+        return self._ranked(self._score_token_lists([query_tokens])[:, 0], k)
+
+    @profiled("bm25.top_k")
+    def top_k_batch(self, queries, k):
+        """top_k() for many queries, scored in one sparse matrix product"""
+        if k <= 0 or not queries:
+            return [[] for _ in queries]
+        scores = self.score_batch(queries)
+        return [self._ranked(scores[:, col], k) for col in range(len(queries))]
+
+
+BACKENDS = {
+    "python": BM25,
+    "sparse": SparseBM25
+}
+
+
+def _resolve_backend(backend):
+    """Map a backend name to its class, falling back to pure Python"""
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}. Available: {', '.join(BACKENDS)}")
+    if backend == "sparse" and _sparse_modules() is None:
+        backend = "python"
+    return backend
+
+
+# ============ MAPPED INDEX FILES ============
+# Versioned binary layout, in native byte order, every section 8-byte aligned:
+#   header    magic, format version, byte-order mark, N, V, P, R, k1, b, avgdl, cache key
+#   sections  (offset, length) table followed by the sections in _MAPPED_SECTIONS order
+# Terms are stored sorted (term id = position) with an open-addressing
+# crc32 hash table over them, so no dict has to be built to open the file.
+_MAPPED_MAGIC = b"UIPXIDX\0"
+_MAPPED_HEADER = "=8sIIIIIIddd64s"
+_MAPPED_BOM = 0x01020304
+_MAPPED_SECTIONS = [
+    ("term_offsets", "I"), ("term_bytes", "B"), ("term_hash", "I"), ("idf", "d"), ("upper_bounds", "d"),
+    ("offsets", "I"), ("doc_ids", "I"), ("tfs", "I"), ("doc_lengths", "I"),
+    ("columns", "B"), ("row_offsets", "Q"), ("row_bytes", "B")
+]
+
+
+class _MappedTerms:
+    """Read-only term -> id mapping over the mapped vocabulary table"""
+
+    __slots__ = ("_offsets", "_bytes", "_slots")
+
+    def __init__(self, offsets, data, slots):
+        self._offsets = offsets
+        self._bytes = data
+        self._slots = slots
+
+    def _term(self, term_id):
+        return bytes(self._bytes[self._offsets[term_id]:self._offsets[term_id + 1]])
+
+    def get(self, word, default=None):
+        from binascii import crc32
+        target = word.encode("utf-8")
+        slots = self._slots
+        mask = len(slots) - 1
+        pos = crc32(target) & mask
+        # Slots hold term id + 1; 0 ends the probe sequence
+        while slots[pos]:
+            term_id = slots[pos] - 1
+            if self._bytes[self._offsets[term_id]:self._offsets[term_id + 1]] == target:
+                return term_id
+            pos = (pos + 1) & mask
+        return default
+
+    def __contains__(self, word):
+        return self.get(word) is not None
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __iter__(self):
+        for term_id in range(len(self)):
+            yield self._term(term_id).decode("utf-8")
+
+    def items(self):
+        return ((word, term_id) for term_id, word in enumerate(self))
+
+
+class _MappedRows:
+    """Read-only output rows, one JSON array per row behind an offset table"""
+
+    __slots__ = ("columns", "_offsets", "_bytes")
+
+    def __init__(self, columns, offsets, data):
+        self.columns = tuple(columns)
+        self._offsets = offsets
+        self._bytes = data
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx):
+        values = json.loads(bytes(self._bytes[self._offsets[idx]:self._offsets[idx + 1]]))
+        return dict(zip(self.columns, values))
+
+    def copy(self):
+        """Editable in-memory copy"""
+        rows = [self[idx] for idx in range(len(self))]
+        return _RowStore(self.columns, [[row[col] for row in rows] for col in self.columns])
+
+
+class MappedBM25(BM25):
+    """Read-only BM25 served straight from a memory-mapped index file.
+
+    Arrays are memoryviews over the mapping, so processes opening the same
+    file share one page-cache copy. copy() returns an editable BM25.
+    """
+
+    __slots__ = ("_mmap",)
+
+    def fit(self, documents, workers=1):
+        raise TypeError("MappedBM25 is read-only; fit a BM25 instead")
+
+    def _postings_for_edit(self):
+        raise TypeError("MappedBM25 is read-only; edit a copy()")
+
+    def copy(self):
+        bm25 = BM25(self.k1, self.b)
+        bm25.N = self.N
+        bm25.avgdl = self.avgdl
+        bm25.terms = {sys.intern(word): term_id for term_id, word in enumerate(self.terms)}
+        for name in ("offsets", "doc_ids", "tfs", "doc_lengths", "idf", "upper_bounds"):
+            values = getattr(self, name)
+            packed = array(values.format)
+            packed.frombytes(values.cast("B"))
+            setattr(bm25, name, packed)
+        return bm25
+
+
+def _term_hash_table(encoded):
+    """Open-addressing table (load factor <= 0.5) of term id + 1 by crc32"""
+    from binascii import crc32
+    size = 1
+    while size < 2 * len(encoded):
+        size *= 2
+    slots = array("I", [0]) * size
+    for term_id, term in enumerate(encoded):
+        pos = crc32(term) & (size - 1)
+        while slots[pos]:
+            pos = (pos + 1) & (size - 1)
+        slots[pos] = term_id + 1
+    return slots
+
+
+def _write_mapped_index(path, key, bm25, rows):
+    """Serialize a fitted index and its spilled output rows (_RowSpill) into the binary layout"""
+    import struct
+
+    words = sorted(bm25.terms)
+    term_ids = [bm25.terms[word] for word in words]
+    encoded = [word.encode("utf-8") for word in words]
+    offsets = bm25.offsets
+    sections = {
+        "term_offsets": array("I", [0, *accumulate(len(term) for term in encoded)]),
+        "term_bytes": b"".join(encoded),
+        "term_hash": _term_hash_table(encoded),
+        "idf": array("d", [bm25.idf[t] for t in term_ids]),
+        "upper_bounds": array("d", [bm25.upper_bounds[t] for t in term_ids]),
+        "offsets": array("I", [0, *accumulate(offsets[t + 1] - offsets[t] for t in term_ids)]),
+        "doc_ids": array("I"),
+        "tfs": array("I"),
+        "doc_lengths": array("I", bm25.doc_lengths),
+        "columns": json.dumps(list(rows.columns), ensure_ascii=False).encode("utf-8")
+    }
+    for t in term_ids:
+        sections["doc_ids"].extend(bm25.doc_ids[offsets[t]:offsets[t + 1]])
+        sections["tfs"].extend(bm25.tfs[offsets[t]:offsets[t + 1]])
+    sections["row_offsets"] = rows.offsets
+
+    header = struct.pack(
+        _MAPPED_HEADER, _MAPPED_MAGIC, INDEX_FORMAT_VERSION, _MAPPED_BOM,
+        bm25.N, len(words), len(sections["doc_ids"]), len(rows),
+        bm25.k1, bm25.b, bm25.avgdl, key.encode("ascii")
+    )
+    position = len(header) + 16 * len(_MAPPED_SECTIONS)
+    table = []
+    for name, _ in _MAPPED_SECTIONS:
+        length = rows.offsets[-1] if name == "row_bytes" else memoryview(sections[name]).nbytes
+        position += -position % 8
+        table.append((position, length))
+        position += length
+
+    with open(path, 'wb') as f:
+        f.write(header)
+        for offset, length in table:
+            f.write(struct.pack("=QQ", offset, length))
+        for (name, _), (offset, _) in zip(_MAPPED_SECTIONS, table):
+            f.write(b"\0" * (offset - f.tell()))
+            if name == "row_bytes":
+                rows.copy_to(f)
+            else:
+                f.write(sections[name])
+
+
+def _open_mapped_index(path, key):
+    """Map an index file; returns (MappedBM25, _MappedRows) or None when missing/stale/corrupt"""
+    import mmap
+    import struct
+
+    try:
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, version, bom, n, _, _, _, k1, b, avgdl, stored_key = struct.unpack_from(_MAPPED_HEADER, buffer)
+        if magic != _MAPPED_MAGIC or version != INDEX_FORMAT_VERSION or bom != _MAPPED_BOM:
+            return None
+        if stored_key.decode("ascii") != key:
+            return None
+        view = memoryview(buffer)
+        table_start = struct.calcsize(_MAPPED_HEADER)
+        sections = {}
+        for pos, (name, fmt) in enumerate(_MAPPED_SECTIONS):
+            offset, length = struct.unpack_from("=QQ", buffer, table_start + 16 * pos)
+            if offset + length > len(buffer):
+                return None
+            sections[name] = view[offset:offset + length].cast(fmt)
+    except (struct.error, TypeError, ValueError, UnicodeDecodeError):
+        return None
+
+    bm25 = MappedBM25(k1, b)
+    bm25._mmap = buffer
+    bm25.N = n
+    bm25.avgdl = avgdl
+    bm25.terms = _MappedTerms(sections["term_offsets"], sections["term_bytes"], sections["term_hash"])
+    for name in ("idf", "upper_bounds", "offsets", "doc_ids", "tfs", "doc_lengths"):
+        setattr(bm25, name, sections[name])
+    rows = _MappedRows(json.loads(bytes(sections["columns"])), sections["row_offsets"], sections["row_bytes"])
+    return bm25, rows
+
+
+# ============ INDEX REGISTRY ============
+class _RowStore:
+    """Projected output rows stored column-wise.
+
+    One list per output column instead of one dict per row; repeated cell
+    values share a single string. Indexing returns a fresh row dict.
+    """
+
+    __slots__ = ("columns", "values")
+
+    def __init__(self, columns, values=None):
+        self.columns = tuple(columns)
+        self.values = values if values is not None else [[] for _ in self.columns]
+
+    @classmethod
+    def from_rows(cls, data, output_cols):
+        """Project csv.DictReader rows onto the output columns present in the CSV"""
+        store = cls(cls.present_columns(data, output_cols))
+        pool = {}
+        for row in data:
+            store.append(row, pool)
+        return store
+
+    @staticmethod
+    def present_columns(data, output_cols):
+        return tuple(col for col in output_cols if data and col in data[0])
+
+    def append(self, row, pool=None):
+        """Add a csv.DictReader row; values already in pool are shared"""
+        for col, values in zip(self.columns, self.values):
+            value = row.get(col, "")
+            values.append(value if pool is None else pool.setdefault(value, value))
+
+    def __len__(self):
+        return len(self.values[0]) if self.values else 0
+
+    def __getitem__(self, idx):
+        return {col: values[idx] for col, values in zip(self.columns, self.values)}
+
+    def __setitem__(self, idx, row):
+        for col, values in zip(self.columns, self.values):
+            values[idx] = row.get(col, "")
+
+    def __delitem__(self, idx):
+        for values in self.values:
+            del values[idx]
+
+    def insert(self, idx, row):
+        for col, values in zip(self.columns, self.values):
+            values.insert(idx, row.get(col, ""))
+
+    def copy(self):
+        return _RowStore(self.columns, [list(values) for values in self.values])
+
+
+class _RowSpill:
+    """Output rows encoded one at a time into a temporary file.
+
+    Builds stream rows through here into the mapped index file instead of
+    holding every row in memory.
+    """
+
+    __slots__ = ("columns", "offsets", "_file")
+
+    def __init__(self, columns):
+        import tempfile
+        self.columns = tuple(columns)
+        self.offsets = array("Q", [0])
+        self._file = tempfile.TemporaryFile()
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Spill an in-memory row store"""
+        spill = cls(rows.columns)
+        for idx in range(len(rows)):
+            spill.append(rows[idx])
+        return spill
+
+    def append(self, row):
+        encoded = json.dumps([row.get(col, "") for col in self.columns], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._file.write(encoded)
+        self.offsets.append(self.offsets[-1] + len(encoded))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def copy_to(self, f):
+        import shutil
+        self._file.seek(0)
+        shutil.copyfileobj(self._file, f, 1 << 20)
+
+    def to_store(self):
+        """Read the spilled rows back into a _RowStore"""
+        store = _RowStore(self.columns)
+        pool = {}
+        self._file.seek(0)
+        for start, end in zip(self.offsets, self.offsets[1:]):
+            store.append(dict(zip(self.columns, json.loads(self._file.read(end - start)))), pool)
+        return store
+
+    def close(self):
+        self._file.close()
+
+
+class _SearchIndex:
+    """Fitted BM25 index plus projected output rows for one CSV source.
+
+    Never mutated once registered: refreshes build a new _SearchIndex and
+    swap it into the registry, so any number of threads can query it.
+    """
+
+    __slots__ = ("bm25", "rows", "signature", "content_key", "fingerprints")
+
+    def __init__(self, bm25, rows, signature, content_key, fingerprints=None):
+        self.bm25 = bm25
+        self.rows = rows
+        self.signature = signature
+        self.content_key = content_key
+        # Per-row hashes of the indexed CSV, set once the index is watched;
+        # lets a changed CSV be applied as row deltas instead of a refit
+        self.fingerprints = fingerprints
+
+
+# Process-wide registry: (filepath, search_cols, output_cols, backend) -> _SearchIndex.
+# Lookups are lock-free; builds and refreshes of one key hold that key's lock,
+# so concurrent first uses fit an index once.
+_INDEX_REGISTRY = {}
+_REGISTRY_STATS = {"hits": 0, "misses": 0, "refreshes": 0, "deltas": 0}
+_BUILD_LOCKS = {}
+_STATS_LOCK = threading.Lock()
+
+
+def _build_lock(key):
+    lock = _BUILD_LOCKS.get(key)
+    if lock is None:
+        lock = _BUILD_LOCKS.setdefault(key, threading.Lock())
+    return lock
+
+
+def _count(stat):
+    with _STATS_LOCK:
+        _REGISTRY_STATS[stat] += 1
+
+
+def _file_signature(filepath):
+    """Cheap change detector for a backing CSV (mtime + size)"""
+    stat = filepath.stat()
+    return (stat.st_mtime_ns, stat.st_size)
 
-    data = _load_csv(filepath)
 
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+def _file_digest(filepath):
+    """sha256 of a file, read in blocks"""
+    import hashlib
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest
 
-    # BM25 search
-    bm25 = BM25()
-    bm25.fit(documents)
-    ranked = bm25.score(query)
 
-    # Get top results with score > 0
-    results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
+def _cache_key(digest, search_cols, output_cols):
+    """Content hash identifying a fitted index on disk (digest: sha256 of the CSV bytes)"""
+    digest = digest.copy()
+    digest.update(json.dumps([search_cols, output_cols, TOKENIZER_VERSION, INDEX_FORMAT_VERSION]).encode("utf-8"))
+    return digest.hexdigest()
 
+
+def _cache_path(filepath, search_cols, output_cols, key):
+    """<stem>-<source>-<key>.idx; source hashes the resolved CSV path and the
+    column set, so same-named CSVs (e.g. an external corpus) and other
+    column sets of one CSV keep separate entries"""
+    import hashlib
+    source = json.dumps([str(Path(filepath).resolve()), list(search_cols), list(output_cols)])
+    source_hash = hashlib.sha256(source.encode("utf-8")).hexdigest()[:12]
+    return INDEX_CACHE_DIR / f"{filepath.stem}-{source_hash}-{key[:24]}.idx"
+
+
+def _prune_cached_indices(path):
+    """Delete the other cache entries of path's source: superseded content,
+    tokenizer or format versions. Also deletes entries in the older
+    <stem>-<key> naming, including format 1-2 JSON files, which are
+    never read again.
+
+    Names must match exactly, so react.csv never prunes react-native.csv
+    and another source with the same stem keeps its entry. Processes
+    still mapping a deleted file keep reading it; failures (e.g. a file
+    in use on Windows) are ignored.
+    """
+    stem, source_hash, _ = path.stem.rsplit("-", 2)
+    pattern = re.compile(rf"{re.escape(stem)}-(?:{source_hash}-)?[0-9a-f]{{24}}\.(?:idx|json)")
+    try:
+        entries = list(path.parent.iterdir())
+    except OSError:
+        return
+    for entry in entries:
+        if entry.name != path.name and pattern.fullmatch(entry.name):
+            try:
+                entry.unlink()
+            except OSError:
+                pass
+
+
+@profiled("index.cache_read")
+def _read_cached_index(path, key, bm25_class=BM25):
+    """Open a cached index, or None when missing/stale/corrupt.
+
+    The python backend queries the mapping directly; other backends
+    build their own structures from it.
+    """
+    mapped = _open_mapped_index(path, key)
+    if mapped is None or bm25_class is BM25:
+        return mapped
+    return bm25_class.from_state(mapped[0].get_state()), mapped[1]
+
+
+@profiled("index.cache_write")
+def _write_cached_index(path, key, bm25, rows):
+    """Atomically persist a fitted index, replacing the CSV's older entries;
+    cache failures are non-fatal.
+
+    rows is a _RowSpill, or a row store that gets spilled first.
+    """
+    spill = rows if isinstance(rows, _RowSpill) else _RowSpill.from_rows(rows)
+    # Unique per thread: registry keys of different backends, and rebuilds, write the same path
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_mapped_index(tmp, key, bm25, spill)
+        os.replace(tmp, path)
+        _prune_cached_indices(path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+    finally:
+        if spill is not rows:
+            spill.close()
+
+
+@profiled("index.build")
+def _build_index(filepath, search_cols, output_cols, signature, rebuild=False, backend="python", cache=None):
+    """Stream a CSV, fit BM25 over search columns and store output columns.
+
+    Rows are read, tokenized and indexed one at a time; with the index
+    cache enabled, output rows are spilled straight into the index file
+    rather than kept in memory. CSVs of at least BUILD_PARALLEL_MIN_BYTES
+    are tokenized by BUILD_WORKERS processes.
+
+    Fitted indices are reused from INDEX_CACHE_DIR when the CSV content,
+    columns and tokenizer are unchanged, unless rebuild is set. The cached
+    file is backend-independent; the python backend memory-maps it, so
+    every process using the same cache shares one copy. cache=False builds
+    a purely in-memory index (default: INDEX_CACHE_ENABLED).
+    """
+    import hashlib
+
+    cache = INDEX_CACHE_ENABLED if cache is None else cache
+    bm25_class = BACKENDS[backend]
+    if cache and not rebuild:
+        key = _cache_key(_file_digest(filepath), search_cols, output_cols)
+        cached = _read_cached_index(_cache_path(filepath, search_cols, output_cols, key), key, bm25_class)
+        if cached is not None:
+            return _SearchIndex(cached[0], cached[1], signature, key)
+
+    # Hash the bytes actually indexed, so the cache key matches the content
+    # even if the CSV changes while it is being read
+    digest = hashlib.sha256() if cache else None
+    reader = _read_csv(filepath, digest)
+    columns = [col for col in output_cols if col in (reader.fieldnames or ())]
+    if digest is not None:
+        rows = _RowSpill(columns)
+        spill = rows.append
+    else:
+        rows = _RowStore(columns)
+        spill = partial(rows.append, pool={})
+
+    def documents():
+        for row in reader:
+            spill(row)
+            yield _document(row, search_cols)
+
+    bm25 = bm25_class()
+    bm25.fit(documents(), BUILD_WORKERS if signature[1] >= BUILD_PARALLEL_MIN_BYTES else 1)
+
+    if digest is None:
+        return _SearchIndex(bm25, rows, signature, f"{filepath}:{signature[0]}:{signature[1]}")
+
+    key = _cache_key(digest, search_cols, output_cols)
+    path = _cache_path(filepath, search_cols, output_cols, key)
+    _write_cached_index(path, key, bm25, rows)
+    mapped = _open_mapped_index(path, key)
+    if mapped is not None and bm25_class is BM25:
+        bm25 = mapped[0]
+    store = mapped[1] if mapped is not None else rows.to_store()
+    rows.close()
+    return _SearchIndex(bm25, store, signature, key)
+
+
+def _read_csv(filepath, digest=None):
+    """Stream csv.DictReader rows from filepath, feeding the raw bytes to digest.
+
+    Line endings are translated like open(newline=None), matching _parse_csv().
+    """
+    import csv
+
+    def lines():
+        with open(filepath, 'rb') as f:
+            for line in f:
+                if digest is not None:
+                    digest.update(line)
+                text = line.decode('utf-8')
+                if "\r" not in text:
+                    yield text
+                    continue
+                # Old Mac line endings: a lone \r ends a line too
+                parts = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+                for part in parts[:-1]:
+                    yield part + "\n"
+                if parts[-1]:
+                    yield parts[-1]
+
+    return csv.DictReader(lines())
+
+
+def _parse_csv(raw):
+    import csv
+    import io
+    return list(csv.DictReader(io.StringIO(raw.decode('utf-8'), newline=None)))
+
+
+def _document(row, search_cols):
+    return " ".join(str(row.get(col, "")) for col in search_cols)
+
+
+def _project(row, output_cols):
+    return {col: row.get(col, "") for col in output_cols if col in row}
+
+
+def _fingerprints(data, search_cols, output_cols):
+    """Hash of the indexed fields of each row (only compared within this process)"""
+    return array("q", [hash((_document(row, search_cols), tuple(_project(row, output_cols).items()))) for row in data])
+
+
+def _apply_row_deltas(index, filepath, search_cols, output_cols, signature):
+    """Diff a changed CSV against a watched index and apply only the changed rows.
+
+    Works on a copy, so readers holding the old index are unaffected.
+    Returns (new_index, {"added", "updated", "removed"}).
+    """
+    from difflib import SequenceMatcher
+
+    raw = filepath.read_bytes()
+    data = _parse_csv(raw)
+    fingerprints = _fingerprints(data, search_cols, output_cols)
+    bm25 = index.bm25.copy()
+    rows = index.rows.copy()
+    changes = {"added": 0, "updated": 0, "removed": 0}
+
+    opcodes = SequenceMatcher(None, index.fingerprints, fingerprints, autojunk=False).get_opcodes()
+    # Apply back to front so earlier row positions stay valid
+    for tag, i1, i2, j1, j2 in reversed(opcodes):
+        if tag == "equal":
+            continue
+        common = min(i2 - i1, j2 - j1)
+        for offset in range(common):
+            row = data[j1 + offset]
+            bm25.update_document(i1 + offset, _document(row, search_cols), refresh=False)
+            rows[i1 + offset] = row
+        for idx in range(i2 - 1, i1 + common - 1, -1):
+            bm25.remove_document(idx, refresh=False)
+            del rows[idx]
+        for offset in range(common, j2 - j1):
+            row = data[j1 + offset]
+            bm25.insert_document(i1 + offset, _document(row, search_cols), refresh=False)
+            rows.insert(i1 + offset, row)
+        changes["updated"] += common
+        changes["removed"] += (i2 - i1) - common
+        changes["added"] += (j2 - j1) - common
+    bm25.refresh_stats()
+    if rows.columns != _RowStore.present_columns(data, output_cols):
+        rows = _RowStore.from_rows(data, output_cols)  # output columns added/removed
+
+    key = None
+    if INDEX_CACHE_ENABLED:
+        import hashlib
+        key = _cache_key(hashlib.sha256(raw), search_cols, output_cols)
+        _write_cached_index(_cache_path(filepath, search_cols, output_cols, key), key, bm25, rows)
+    content_key = key or f"{filepath}:{signature[0]}:{signature[1]}"
+    return _SearchIndex(bm25, rows, signature, content_key, fingerprints), changes
+
+
+@profiled("index.get")
+def get_index(filepath, search_cols, output_cols, backend=None):
+    """Return the fitted index for a CSV, building it lazily on first use.
+
+    The index is refreshed when the CSV's mtime or size changes: as row
+    deltas when the index is watched, otherwise by a full rebuild.
+    """
+    backend = _resolve_backend(backend)
+    key = (str(filepath), tuple(search_cols), tuple(output_cols), backend)
+    signature = _file_signature(filepath)
+    index = _INDEX_REGISTRY.get(key)
+
+    if index is not None and index.signature == signature:
+        # Unlocked on the hot path: approximate when threads run in parallel
+        _REGISTRY_STATS["hits"] += 1
+        return index
+
+    with _build_lock(key):
+        # Another thread may have (re)built it while this one waited
+        index = _INDEX_REGISTRY.get(key)
+        signature = _file_signature(filepath)
+        if index is not None and index.signature == signature:
+            _count("hits")
+            return index
+
+        if index is not None and index.fingerprints is not None:
+            index, _ = _apply_row_deltas(index, filepath, search_cols, output_cols, signature)
+            _count("deltas")
+        else:
+            _count("refreshes" if index is not None else "misses")
+            index = _build_index(filepath, search_cols, output_cols, signature, backend=backend)
+        _INDEX_REGISTRY[key] = index
+    return index
+
+
+def _index_sources():
+    """(filepath, search_cols, output_cols) for every configured domain and stack"""
+    sources = [(DATA_DIR / c["file"], c["search_cols"], c["output_cols"]) for c in CSV_CONFIG.values()]
+    sources += [(DATA_DIR / c["file"], _STACK_COLS["search_cols"], _STACK_COLS["output_cols"]) for c in STACK_CONFIG.values()]
+    return sources
+
+
+def rebuild_indices():
+    """Refit every domain and stack index, overwriting the on-disk cache"""
+    rebuilt = []
+    for filepath, search_cols, output_cols in _index_sources():
+        if not filepath.exists():
+            continue
+        key = (str(filepath), tuple(search_cols), tuple(output_cols), "python")
+        with _build_lock(key):
+            signature = _file_signature(filepath)
+            _INDEX_REGISTRY[key] = _build_index(filepath, search_cols, output_cols, signature, rebuild=True)
+        rebuilt.append(str(filepath))
+    return rebuilt
+
+
+def watch_indices(backend=None):
+    """Load every domain/stack index and start tracking its rows for deltas"""
+    for filepath, search_cols, output_cols in _index_sources():
+        if not filepath.exists():
+            continue
+        index = get_index(filepath, search_cols, output_cols, backend)
+        if index.fingerprints is not None:
+            continue
+        key = (str(filepath), tuple(search_cols), tuple(output_cols), _resolve_backend(backend))
+        with _build_lock(key):
+            index = _INDEX_REGISTRY.get(key)
+            raw = filepath.read_bytes()
+            if index is None or index.fingerprints is not None or _file_signature(filepath) != index.signature:
+                continue  # watched meanwhile, or edited mid-load (the next get_index() refits it)
+            fingerprints = _fingerprints(_parse_csv(raw), search_cols, output_cols)
+            _INDEX_REGISTRY[key] = _SearchIndex(index.bm25, index.rows, index.signature, index.content_key, fingerprints)
+
+
+def refresh_indices():
+    """Apply pending CSV edits to every resident index.
+
+    Returns one {"file", "added", "updated", "removed"} entry per changed
+    source (watched indices) or {"file", "rebuilt": True} (unwatched).
+    """
+    changed = []
+    for key in list(_INDEX_REGISTRY):
+        filepath = Path(key[0])
+        if not filepath.exists():
+            continue
+        with _build_lock(key):
+            index = _INDEX_REGISTRY.get(key)
+            signature = _file_signature(filepath)
+            if index is None or index.signature == signature:
+                continue
+            if index.fingerprints is not None:
+                index, changes = _apply_row_deltas(index, filepath, list(key[1]), list(key[2]), signature)
+                _count("deltas")
+            else:
+                index = _build_index(filepath, list(key[1]), list(key[2]), signature, backend=key[3])
+                changes = {"rebuilt": True}
+                _count("refreshes")
+            _INDEX_REGISTRY[key] = index
+        changed.append(dict(changes, file=str(filepath)))
+    return changed
+
+
+def watch(interval=1.0, on_change=None, stop_event=None, backend=None):
+    """Poll the guideline CSVs and apply row deltas until stop_event is set"""
+    import time
+    watch_indices(backend)
+    while stop_event is None or not stop_event.is_set():
+        for change in refresh_indices():
+            if on_change:
+                on_change(change)
+        if stop_event is not None:
+            stop_event.wait(interval)
+        else:
+            time.sleep(interval)
+
+
+def index_stats():
+    """Registry hit/miss counters and number of resident indices"""
+    return dict(_REGISTRY_STATS, indices=len(_INDEX_REGISTRY))
+
+
+def clear_index_registry():
+    """Drop every resident index and reset the counters"""
+    _INDEX_REGISTRY.clear()
+    for key in _REGISTRY_STATS:
+        _REGISTRY_STATS[key] = 0
+
+
+# ============ MEMORY REPORT ============
+# Index parts reported by memory_report(), by attribute
+_MEMORY_PARTS = {
+    "postings": ("offsets", "doc_ids", "tfs", "doc_lengths"),
+    "vocabulary": ("terms", "idf", "upper_bounds"),
+    "matrix": ("matrix",),
+}
+
+
+def _deep_sizeof(obj, seen=None):
+    """Bytes held by obj and everything it references (each object counted once).
+
+    Buffers a memoryview or mmap exposes are not counted: for mapped
+    indices they live in the shared page cache, not the heap.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or obj is None or isinstance(obj, type):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "nbytes") and hasattr(obj, "dtype"):
+            # numpy array: getsizeof only includes the data when the array owns it
+            total += 0 if obj.base is None else obj.nbytes
+        elif hasattr(obj, "indptr") and hasattr(obj, "data"):
+            stack.extend((obj.data, obj.indices, obj.indptr))  # scipy sparse matrix
+        elif not isinstance(obj, (str, bytes, bytearray, int, float, array, memoryview)):
+            for cls in type(obj).__mro__:
+                for name in getattr(cls, "__slots__", ()):
+                    value = getattr(obj, name, None)
+                    if name != "_mmap":
+                        stack.append(value)
+            if hasattr(obj, "__dict__"):
+                stack.append(obj.__dict__)
+    return total
+
+
+def _index_parts(index):
+    """Deep size (bytes) of each part of a fitted _SearchIndex"""
+    seen = set()
+    parts = {"rows": _deep_sizeof(index.rows, seen)}
+    for part, names in _MEMORY_PARTS.items():
+        parts[part] = sum(_deep_sizeof(getattr(index.bm25, name, None), seen) for name in names)
+    parts["fingerprints"] = _deep_sizeof(index.fingerprints, seen)
+    return parts
+
+
+def _traced_build(filepath, search_cols, output_cols, backend, cache):
+    """Build one index under tracemalloc: (index, retained bytes, peak bytes, top allocation sites)"""
+    import gc
+    import tracemalloc
+
+    gc.collect()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    index = _build_index(filepath, search_cols, output_cols, _file_signature(filepath), backend=backend, cache=cache)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    sites = [
+        {"site": f"{Path(stat.traceback[0].filename).name}:{stat.traceback[0].lineno}", "bytes": stat.size_diff}
+        for stat in tracemalloc.take_snapshot().compare_to(before, "lineno")[:3] if stat.size_diff > 0
+    ]
+    return index, current - base, peak - base, sites
+
+
+def memory_report(backend=None):
+    """Heap cost of every domain and stack index, measured with tracemalloc.
+
+    Each source is fitted from its CSV into memory (the index cache is
+    bypassed), reporting the bytes retained once fitting is done, the peak
+    while fitting, the biggest allocation sites and a deep-size breakdown
+    of the parts: output rows (projected columns; the raw CSV rows are
+    streamed and not retained), postings (tokenized corpus), vocabulary
+    (terms, idf, score bounds) and, for the sparse backend, the matrix.
+    With the index cache enabled it also reports the cache file size and
+    the heap a memory-mapped open costs. Nothing is registered, so
+    resident indices are unaffected.
+    """
+    import tracemalloc
+
+    backend = _resolve_backend(backend)
+    sources = [(domain, DATA_DIR / c["file"], c["search_cols"], c["output_cols"]) for domain, c in CSV_CONFIG.items()]
+    sources += [(f"stack:{stack}", DATA_DIR / c["file"], _STACK_COLS["search_cols"], _STACK_COLS["output_cols"])
+                for stack, c in STACK_CONFIG.items()]
+    if backend == "sparse":
+        _sparse_modules()  # keep the one-off numpy/scipy import out of the first source
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    report = []
+    try:
+        for name, filepath, search_cols, output_cols in sources:
+            if not filepath.exists():
+                continue
+            index, retained, peak, sites = _traced_build(filepath, search_cols, output_cols, backend, cache=False)
+            entry = {
+                "source": name,
+                "file": str(filepath),
+                "csv_bytes": filepath.stat().st_size,
+                "rows": len(index.rows),
+                "terms": len(index.bm25.terms),
+                "postings": len(index.bm25.doc_ids),
+                "retained_bytes": retained,
+                "fit_peak_bytes": peak,
+                "parts": _index_parts(index),
+                "top_sites": sites
+            }
+            del index
+            if INDEX_CACHE_ENABLED:
+                _build_index(filepath, search_cols, output_cols, _file_signature(filepath), backend=backend)
+                mapped, mapped_heap, _, _ = _traced_build(filepath, search_cols, output_cols, backend, cache=True)
+                entry["mapped"] = {
+                    "file_bytes": _cache_path(filepath, search_cols, output_cols, mapped.content_key).stat().st_size,
+                    "heap_bytes": mapped_heap
+                }
+                del mapped
+            report.append(entry)
+    finally:
+        if started:
+            tracemalloc.stop()
+
+    return {
+        "backend": backend,
+        "sources": report,
+        "totals": {
+            "retained_bytes": sum(entry["retained_bytes"] for entry in report),
+            "max_fit_peak_bytes": max((entry["fit_peak_bytes"] for entry in report), default=0),
+            "mapped_file_bytes": sum(entry.get("mapped", {}).get("file_bytes", 0) for entry in report),
+            "mapped_heap_bytes": sum(entry.get("mapped", {}).get("heap_bytes", 0) for entry in report)
+        }
+    }
+
+
+# ============ RESULT CACHE ============
+class _CacheStripe:
+    """One independently locked LRU segment of the result cache"""
+
+    __slots__ = ("lock", "entries", "maxsize", "hits", "misses", "disk_hits")
+
+    def __init__(self, maxsize):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = self.misses = self.disk_hits = 0
+
+    def remember(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+class _ResultCache:
+    """LRU cache of search results, optionally backed by a shared SQLite file.
+
+    Keys embed the index content key, so entries for an edited CSV are
+    never served again and simply age out. Keys are spread by hash over
+    RESULT_CACHE_STRIPES independently locked LRUs, so concurrent
+    searches rarely contend; recency is tracked per stripe.
+    """
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE, path=RESULT_CACHE_DB, stripes=RESULT_CACHE_STRIPES):
+        self.maxsize = maxsize
+        self.path = path
+        count = max(1, min(stripes, maxsize))
+        self.stripes = [_CacheStripe(max(1, maxsize // count)) for _ in range(count)]
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._disk_writes = 0
+
+    def _stripe(self, key):
+        return self.stripes[hash(key) % len(self.stripes)]
+
+    def _connect(self):
+        if self._db is None and self.path:
+            import sqlite3
+            try:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+                self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT, used REAL)")
+            except (OSError, sqlite3.Error):
+                self.path = None
+                self._db = None
+        return self._db
+
+    def get(self, key):
+        """Cached results for key (fresh copies), or None"""
+        if self.maxsize <= 0:
+            return None
+        stripe = self._stripe(key)
+        with stripe.lock:
+            value = stripe.entries.get(key)
+            if value is not None:
+                stripe.entries.move_to_end(key)
+                stripe.hits += 1
+        if value is not None:
+            return [dict(row) for row in value]
+
+        value = self._disk_get(key)
+        with stripe.lock:
+            if value is None:
+                stripe.misses += 1
+                return None
+            stripe.remember(key, value)
+            stripe.hits += 1
+            stripe.disk_hits += 1
+        return [dict(row) for row in value]
+
+    def _disk_get(self, key):
+        if not self.path:
+            return None
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return None
+            import sqlite3
+            import time
+            try:
+                row = db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    db.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+            except sqlite3.Error:
+                row = None
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, key, results):
+        if self.maxsize <= 0:
+            return
+        value = [dict(row) for row in results]
+        stripe = self._stripe(key)
+        with stripe.lock:
+            stripe.remember(key, value)
+        if not self.path:
+            return
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return
+            import sqlite3
+            import time
+            try:
+                db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                           (key, json.dumps(value, ensure_ascii=False), time.time()))
+                self._disk_writes += 1
+                if self._disk_writes % 256 == 0:
+                    # Least recently used entries (including stale CSV versions) go first
+                    db.execute("DELETE FROM results WHERE key NOT IN "
+                               "(SELECT key FROM results ORDER BY used DESC LIMIT ?)", (RESULT_CACHE_DB_ROWS,))
+            except sqlite3.Error:
+                pass
+
+    def clear(self):
+        for stripe in self.stripes:
+            with stripe.lock:
+                stripe.entries.clear()
+                stripe.hits = stripe.misses = stripe.disk_hits = 0
+        with self._db_lock:
+            db = self._connect()
+            if db is not None:
+                import sqlite3
+                try:
+                    db.execute("DELETE FROM results")
+                except sqlite3.Error:
+                    pass
+
+    def stats(self):
+        hits = sum(stripe.hits for stripe in self.stripes)
+        misses = sum(stripe.misses for stripe in self.stripes)
+        return {
+            "size": sum(len(stripe.entries) for stripe in self.stripes),
+            "maxsize": self.maxsize,
+            "hits": hits,
+            "misses": misses,
+            "disk_hits": sum(stripe.disk_hits for stripe in self.stripes),
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "disk_path": self.path
+        }
+
+
+_RESULT_CACHE = _ResultCache()
+
+
+def configure_result_cache(maxsize=None, path=None):
+    """Resize the in-memory LRU (0 disables caching) and/or attach a shared SQLite store"""
+    global _RESULT_CACHE
+    _RESULT_CACHE = _ResultCache(
+        _RESULT_CACHE.maxsize if maxsize is None else maxsize,
+        _RESULT_CACHE.path if path is None else path
+    )
+
+
+def result_cache_stats():
+    """Hit/miss counters and hit rate of the query result cache"""
+    return _RESULT_CACHE.stats()
+
+
+def clear_result_cache():
+    """Drop cached results (in memory and in the shared store) and reset counters"""
+    _RESULT_CACHE.clear()
+
+
+def _result_key(index, query, max_results):
+    return json.dumps([index.content_key, index.bm25.backend, query, max_results], ensure_ascii=False)
+
+
+# ============ KEYWORD CLASSIFIER ============
+class KeywordClassifier:
+    """Per-class keyword hit counts from a single pass over the text.
+
+    A {label: [keywords]} table is compiled once into an Aho-Corasick
+    automaton (a full transition table, so each character costs one dict
+    lookup). A class scores one hit per keyword that occurs anywhere in
+    the lowercased text, exactly like sum(kw in text.lower() for kw in
+    keywords). Labels keep the table's order.
+    """
+
+    __slots__ = ("labels", "_delta", "_outputs", "_keyword_classes")
+
+    def __init__(self, table):
+        self.labels = list(table)
+        keyword_ids = {}
+        self._keyword_classes = []
+        for cls, keywords in enumerate(table.values()):
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword not in keyword_ids:
+                    keyword_ids[keyword] = len(self._keyword_classes)
+                    self._keyword_classes.append([])
+                self._keyword_classes[keyword_ids[keyword]].append(cls)
+
+        # Trie of every keyword
+        goto = [{}]
+        outputs = [[]]
+        for keyword, keyword_id in keyword_ids.items():
+            state = 0
+            for ch in keyword:
+                if ch not in goto[state]:
+                    goto[state][ch] = len(goto)
+                    goto.append({})
+                    outputs.append([])
+                state = goto[state][ch]
+            outputs[state].append(keyword_id)
+
+        # Failure links in breadth-first order, folded into full transitions
+        delta = [None] * len(goto)
+        delta[0] = dict(goto[0])
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            delta[state] = dict(delta[fail[state]])
+            delta[state].update(goto[state])
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for ch, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(ch, 0)
+                queue.append(child)
+        self._delta = delta
+        self._outputs = [tuple(out) for out in outputs]
+
+    def _matched(self, text):
+        """Ids of the keywords occurring in text"""
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        matched = set()
+        for ch in text.lower():
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                matched.update(outputs[state])
+        return matched
+
+    def counts(self, text):
+        """{label: number of the class's keywords found in text}"""
+        counts = [0] * len(self.labels)
+        for keyword_id in self._matched(text):
+            for cls in self._keyword_classes[keyword_id]:
+                counts[cls] += 1
+        return dict(zip(self.labels, counts))
+
+    def best(self, text, default=None):
+        """Label with the most hits (earliest label on ties), or default when nothing matches"""
+        counts = self.counts(text)
+        best = max(counts, key=counts.get) if counts else None
+        return best if best is not None and counts[best] > 0 else default
+
+    def first(self, text, default=None):
+        """Earliest label with at least one hit, or default"""
+        classes = self._keyword_classes
+        cls = min((classes[keyword_id][0] for keyword_id in self._matched(text)), default=None)
+        return default if cls is None else self.labels[cls]
+
+
+DOMAIN_KEYWORDS = {
+    "color": ["color", "palette", "hex", "#", "rgb"],
+    "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
+    "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
+    "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
+    "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora", "prompt", "css", "implementation", "variable", "checklist", "tailwind"],
+    "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
+    "typography": ["font", "typography", "heading", "serif", "sans"],
+    "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
+    "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
+    "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
+}
+
+_DOMAIN_CLASSIFIER = None
+
+
+# ============ SEARCH FUNCTIONS ============
+@profiled("search")
+def _search_csv(filepath, search_cols, output_cols, query, max_results, backend=None):
+    """Core search function using BM25"""
+    if not filepath.exists():
+        return []
+
+    index = get_index(filepath, search_cols, output_cols, backend)
+    key = _result_key(index, query, max_results)
+    results = _RESULT_CACHE.get(key)
+    if results is not None:
+        return results
+
+    # Top results with score > 0
+    results = [index.rows[idx] for idx, _ in index.bm25.top_k(query, max_results)]
+    _RESULT_CACHE.put(key, results)
     return results
 
 
 def detect_domain(query):
     """Auto-detect the most relevant domain from query"""
-    query_lower = query.lower()
-
-    domain_keywords = {
-        "color": ["color", "palette", "hex", "#", "rgb"],
-        "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
-        "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
-        "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
-        "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora", "prompt", "css", "implementation", "variable", "checklist", "tailwind"],
-        "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
-        "typography": ["font", "typography", "heading", "serif", "sans"],
-        "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
-        "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
-        "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
-    }
+    global _DOMAIN_CLASSIFIER
+    if _DOMAIN_CLASSIFIER is None:
+        _DOMAIN_CLASSIFIER = KeywordClassifier(DOMAIN_KEYWORDS)
+    return _DOMAIN_CLASSIFIER.best(query, "style")
 
-    scores = {domain: sum(1 for kw in keywords if kw in query_lower) for domain, keywords in domain_keywords.items()}
-    best = max(scores, key=scores.get)
-    return best if scores[best] > 0 else "style"
 
+def _domain_result(domain, config, query, results):
+    return {
+        "domain": domain,
+        "query": query,
+        "file": config["file"],
+        "count": len(results),
+        "results": results
+    }
 
-def search(query, domain=None, max_results=MAX_RESULTS):
+
+def search(query, domain=None, max_results=MAX_RESULTS, backend=None):
     """Main search function with auto-domain detection"""
     if domain is None:
         domain = detect_domain(query)
@@ -220,18 +1987,60 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"File not found: {filepath}", "domain": domain}
 
-    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
+    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results, backend)
 
-    return {
-        "domain": domain,
-        "query": query,
-        "file": config["file"],
-        "count": len(results),
-        "results": results
-    }
+    return _domain_result(domain, config, query, results)
+
+
+@profiled("search_many")
+def search_many(queries, domain=None, max_results=MAX_RESULTS, backend=None):
+    """Search a batch of queries; returns one search() result per query, in order.
+
+    Queries are grouped by (detected) domain and each group is scored
+    against a single loaded index, in one matrix product on the sparse
+    backend.
+    """
+    groups = defaultdict(list)
+    for pos, query in enumerate(queries):
+        groups[domain if domain is not None else detect_domain(query)].append(pos)
+
+    output = [None] * len(queries)
+    for group_domain, positions in groups.items():
+        config = CSV_CONFIG.get(group_domain, CSV_CONFIG["style"])
+        filepath = DATA_DIR / config["file"]
+        if not filepath.exists():
+            for pos in positions:
+                output[pos] = {"error": f"File not found: {filepath}", "domain": group_domain}
+            continue
+
+        index = get_index(filepath, config["search_cols"], config["output_cols"], backend)
+        pending = {}
+        for pos in positions:
+            if queries[pos] in pending:
+                pending[queries[pos]].append(pos)
+                continue
+            results = _RESULT_CACHE.get(_result_key(index, queries[pos], max_results))
+            if results is None:
+                pending[queries[pos]] = [pos]
+            else:
+                output[pos] = _domain_result(group_domain, config, queries[pos], results)
 
+        group_queries = list(pending)
+        if hasattr(index.bm25, "top_k_batch"):
+            ranked = index.bm25.top_k_batch(group_queries, max_results)
+        else:
+            ranked = [index.bm25.top_k(query, max_results) for query in group_queries]
 
-def search_stack(query, stack, max_results=MAX_RESULTS):
+        for query, hits in zip(group_queries, ranked):
+            results = [index.rows[idx] for idx, _ in hits]
+            _RESULT_CACHE.put(_result_key(index, query, max_results), results)
+            for pos in pending[query]:
+                output[pos] = _domain_result(group_domain, config, query, [dict(row) for row in results])
+
+    return output
+
+
+def search_stack(query, stack, max_results=MAX_RESULTS, backend=None):
     """Search stack-specific guidelines"""
     if stack not in STACK_CONFIG:
         return {"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"}
@@ -241,7 +2050,7 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"Stack file not found: {filepath}", "stack": stack}
 
-    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results)
+    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results, backend)
 
     return {
         "domain": "stack",
@@ -251,3 +2060,100 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
         "count": len(results),
         "results": results
     }
+
+
+# ============ FEDERATED SEARCH ============
+class FederatedIndex:
+    """Every domain and stack index behind one unified vocabulary.
+
+    The vocabulary maps each term to the sources whose corpus contains it,
+    so a query is tokenized once and only sources sharing a token with it
+    are scored. Each source keeps its own BM25 statistics, so per-source
+    hits are identical to search()/search_stack().
+    """
+
+    def __init__(self, sources):
+        # sources: list of (kind, name, file, _SearchIndex)
+        self.sources = sources
+        self.signature = tuple(index.signature for _, _, _, index in sources)
+        self.vocab = {}
+        for pos, (_, _, _, index) in enumerate(sources):
+            for term in index.bm25.terms:
+                self.vocab.setdefault(term, []).append(pos)
+
+    def search(self, query, max_results=MAX_RESULTS):
+        """Best hits per source plus a globally merged top-k"""
+        tokens = self.sources[0][3].bm25.tokenize(query) if self.sources else []
+        touched = sorted({pos for token in tokens for pos in self.vocab.get(token, ())})
+
+        per_source = {}
+        merged = []
+        for pos in touched:
+            kind, name, file, index = self.sources[pos]
+            hits = index.bm25.top_k_tokens(tokens, max_results)
+            per_source[pos] = [index.rows[idx] for idx, _ in hits]
+            merged.extend((-score, pos, idx) for idx, score in hits)
+        merged.sort()
+
+        domains = {}
+        stacks = {}
+        for pos, (kind, name, file, _) in enumerate(self.sources):
+            results = per_source.get(pos, [])
+            entry = {"file": file, "count": len(results), "results": results}
+            if kind == "stack":
+                stacks[name] = dict(entry, stack=name)
+            else:
+                domains[name] = dict(entry, domain=name)
+
+        top = []
+        for neg_score, pos, idx in merged[:max_results]:
+            kind, name, file, index = self.sources[pos]
+            top.append({kind: name, "file": file, "score": round(-neg_score, 4), "row": index.rows[idx]})
+
+        return {
+            "domain": "all",
+            "query": query,
+            "count": len(top),
+            "results": top,
+            "domains": domains,
+            "stacks": stacks
+        }
+
+
+_FEDERATED = {}
+
+
+def get_federated_index(backend=None):
+    """Return the federated index, rebuilt when any source CSV changes"""
+    backend = _resolve_backend(backend)
+    sources = []
+    for domain, config in CSV_CONFIG.items():
+        filepath = DATA_DIR / config["file"]
+        if filepath.exists():
+            index = get_index(filepath, config["search_cols"], config["output_cols"], backend)
+            sources.append(("domain", domain, config["file"], index))
+    for stack, config in STACK_CONFIG.items():
+        filepath = DATA_DIR / config["file"]
+        if filepath.exists():
+            index = get_index(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], backend)
+            sources.append(("stack", stack, config["file"], index))
+
+    signature = tuple(index.signature for _, _, _, index in sources)
+    federated = _FEDERATED.get(backend)
+    if federated is None or federated.signature != signature:
+        with _build_lock(("federated", backend)):
+            federated = _FEDERATED.get(backend)
+            if federated is None or federated.signature != signature:
+                federated = _FEDERATED[backend] = FederatedIndex(sources)
+    return federated
+
+
+@profiled("search_all")
+def search_all(query, max_results=MAX_RESULTS, backend=None):
+    """Search every domain and stack at once.
+
+    Returns the best hits per domain/stack plus a globally merged top-k
+    ranked by raw BM25 score.
+    """
+    return get_federated_index(backend).search(query, max_results)
+
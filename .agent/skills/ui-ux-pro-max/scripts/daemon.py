@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Search Daemon - keeps every index resident and answers requests over a
+Unix domain socket, so repeated CLI calls skip interpreter startup and
+index construction.
+
+Protocol (one JSON object per line, in both directions):
+    request:  {"op": "search", "args": {"query": "glassmorphism", "domain": "style"}, "identity": {...}}
+    response: {"ok": true, "result": {...}, "identity": {...}}  or  {"ok": false, "error": "..."}
+
+The identity (protocol version, data directory, code fingerprint) must
+match on both sides; a client talking to a daemon from another checkout,
+data set or code version runs the op in-process instead.
+
+Ops: ping, search, search_stack, search_many, search_all, generate_design_system,
+     result_cache_stats
+
+Usage:
+    python search.py --serve [--socket /path/to/search.sock]
+    python daemon.py [--socket /path/to/search.sock]
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+from core import DATA_DIR, INDEX_CACHE_DIR
+
+# ============ CONFIGURATION ============
+DEFAULT_SOCKET = INDEX_CACHE_DIR / "search.sock"
+CONNECT_TIMEOUT = 0.5
+PROTOCOL_VERSION = 2
+SCRIPTS_DIR = Path(__file__).resolve().parent
+CODE_FILES = ["core.py", "design_system.py", "daemon.py"]
+
+OPS = ["ping", "search", "search_stack", "search_many", "search_all", "generate_design_system", "result_cache_stats"]
+
+
+def socket_path(path=None):
+    """Explicit path, else $UIPRO_SOCKET, else DEFAULT_SOCKET"""
+    return Path(path or os.environ.get("UIPRO_SOCKET") or DEFAULT_SOCKET)
+
+
+def identity():
+    """What a daemon and its clients must agree on: protocol, data set and code version.
+
+    The code fingerprint is the path, mtime and size of each module the
+    ops run, so an edited or different checkout never gets answers from
+    a daemon running other code.
+    """
+    code = []
+    for name in CODE_FILES:
+        try:
+            stat = (SCRIPTS_DIR / name).stat()
+        except OSError:
+            continue
+        code.append([str(SCRIPTS_DIR / name), stat.st_mtime_ns, stat.st_size])
+    return {"protocol": PROTOCOL_VERSION, "data_dir": str(DATA_DIR.resolve()), "code": code}
+
+
+# ============ OPERATIONS ============
+_GENERATOR = None
+
+
+def run_op(op, args):
+    """Execute one protocol op in this process"""
+    global _GENERATOR
+    if op == "ping":
+        return {"protocol": PROTOCOL_VERSION, "pid": os.getpid()}
+    if op == "generate_design_system":
+        from design_system import DesignSystemGenerator, generate_design_system
+        if _GENERATOR is None:
+            _GENERATOR = DesignSystemGenerator()
+        return generate_design_system(generator=_GENERATOR, **args)
+    if op in OPS:
+        import core
+        return getattr(core, op)(**args)
+    raise ValueError(f"Unknown op: {op}. Available: {', '.join(OPS)}")
+
+
+def warm():
+    """Load every domain/stack index and the reasoning rules"""
+    global _GENERATOR
+    import core
+    from design_system import DesignSystemGenerator
+    core.get_federated_index()
+    _GENERATOR = DesignSystemGenerator()
+
+
+# ============ SERVER ============
+# socket/socketserver are imported lazily: clients with no daemon running
+# never pay for them.
+def _handle_connection(rfile, wfile, server_identity):
+    """Answer newline-delimited JSON requests until the client disconnects.
+
+    Requests from a client with a different identity are refused with
+    "mismatch" and not executed.
+    """
+    for line in rfile:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            if request.get("identity") != server_identity:
+                response = {"ok": False, "mismatch": True, "identity": server_identity,
+                            "error": "Client and daemon differ in protocol, data directory or code"}
+            else:
+                response = {"ok": True, "result": run_op(request.get("op"), request.get("args") or {}),
+                            "identity": server_identity}
+        except Exception as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+        wfile.flush()
+
+
+def _is_listening(path):
+    import socket
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(str(path))
+        return True
+    except OSError:
+        return False
+
+
+def serve(path=None, on_ready=None, watch_interval=None, on_change=None):
+    """Preload indices and serve requests until interrupted.
+
+    With watch_interval, a background thread applies CSV edits to the
+    resident indices as row deltas.
+    """
+    import signal
+    import socket
+    import socketserver
+    import threading
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("The search daemon needs Unix domain socket support")
+
+    path = socket_path(path)
+    if path.exists():
+        if _is_listening(path):
+            raise RuntimeError(f"A search daemon is already listening on {path}")
+        path.unlink()  # stale socket from a crashed daemon
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    server_identity = identity()  # the code and data this process loaded
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            _handle_connection(self.rfile, self.wfile, server_identity)
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    warm()
+    stop = threading.Event()
+    if watch_interval:
+        import core
+        threading.Thread(
+            target=core.watch,
+            kwargs={"interval": watch_interval, "on_change": on_change, "stop_event": stop},
+            daemon=True
+        ).start()
+    server = Server(str(path), Handler)
+    if threading.current_thread() is threading.main_thread():
+        # Let `kill` run the cleanup below instead of leaving a stale socket
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        if on_ready:
+            on_ready(path)
+        server.serve_forever()
+    finally:
+        stop.set()
+        server.server_close()
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+# ============ CLIENT ============
+def request(op, args, path=None):
+    """Send one request to a running daemon.
+
+    Returns (True, result) on success, or (False, None) when no daemon
+    is reachable or the daemon's identity() differs from this process's.
+    Raises RuntimeError when the daemon reports an error.
+    """
+    if os.environ.get("UIPRO_NO_DAEMON") == "1":
+        return False, None
+    path = socket_path(path)
+    if not path.exists():
+        return False, None
+
+    import socket
+    if not hasattr(socket, "AF_UNIX"):
+        return False, None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(str(path))
+            sock.settimeout(None)
+            client_identity = identity()
+            payload = {"op": op, "args": args, "identity": client_identity}
+            sock.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as f:
+                line = f.readline()
+    except OSError:
+        return False, None
+    if not line:
+        return False, None
+
+    response = json.loads(line)
+    if response.get("mismatch") or (response.get("ok") and response.get("identity") != client_identity):
+        return False, None  # another checkout, data set or code version: answer in-process
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error", "Daemon request failed"))
+    return True, response["result"]
+
+
+def call(op, **args):
+    """Run op on the resident daemon if one is listening, else in-process"""
+    forwarded, result = request(op, args)
+    if forwarded:
+        return result
+    return run_op(op, args)
+
+
+# ============ CLI SUPPORT ============
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="UI Pro Max search daemon")
+    parser.add_argument("--socket", type=str, default=None, help=f"Socket path (default: $UIPRO_SOCKET or {DEFAULT_SOCKET})")
+    parser.add_argument("--watch", type=float, nargs="?", const=1.0, default=None, metavar="SECONDS", help="Apply CSV edits to resident indices (poll interval, default 1s)")
+
+    args = parser.parse_args()
+
+    try:
+        serve(args.socket, on_ready=lambda path: print(f"Listening on {path}", flush=True),
+              watch_interval=args.watch, on_change=lambda change: print(json.dumps(change), flush=True))
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        parser.exit(1, f"Error: {e}\n")
@@ -13,12 +13,17 @@ Usage:
     result = generate_design_system("SaaS dashboard", "My Project", persist=True, page="dashboard")
 """
 
+import copy
 import csv
 import json
 import os
+import sys
+import threading
+from bisect import bisect_right
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
-from core import search, DATA_DIR
+from core import search, get_index, span, profiled, CSV_CONFIG, DATA_DIR, KeywordClassifier
 
 
 # ============ CONFIGURATION ============
@@ -32,62 +37,346 @@ SEARCH_CONFIG = {
     "typography": {"max_results": 2}
 }
 
+# How the independent domain searches are dispatched: "serial", "thread"
+# (thread pool), "process" (process pool) or "free" (one plain thread per
+# search; only useful on free-threaded builds). "auto" picks "free" when the
+# GIL is disabled and "serial" otherwise, since pure-Python scoring cannot
+# overlap under the GIL.
+SEARCH_EXECUTORS = ["serial", "thread", "process", "free"]
+SEARCH_EXECUTOR = os.environ.get("UIPRO_SEARCH_EXECUTOR", "auto")
+SEARCH_WORKERS = int(os.environ.get("UIPRO_SEARCH_WORKERS", "0")) or len(SEARCH_CONFIG)
+
+# Worker pool for manifest generation: "process", "thread" or "interpreter"
+# (subinterpreters, Python 3.14+; falls back to "process" on older versions).
+# Subinterpreters only support the python scoring backend (numpy/scipy do
+# not load in them).
+MANIFEST_POOLS = ["process", "thread", "interpreter"]
+MANIFEST_POOL = os.environ.get("UIPRO_MANIFEST_POOL", "process")
+
+# Page types in priority order: the first type with a keyword in the page context wins
+PAGE_TYPE_KEYWORDS = {
+    "Dashboard / Data View": ["dashboard", "admin", "analytics", "data", "metrics", "stats", "monitor", "overview"],
+    "Checkout / Payment": ["checkout", "payment", "cart", "purchase", "order", "billing"],
+    "Settings / Profile": ["settings", "profile", "account", "preferences", "config"],
+    "Landing / Marketing": ["landing", "marketing", "homepage", "hero", "home", "promo"],
+    "Authentication": ["login", "signin", "signup", "register", "auth", "password"],
+    "Pricing / Plans": ["pricing", "plans", "subscription", "tiers", "packages"],
+    "Blog / Article": ["blog", "article", "post", "news", "content", "story"],
+    "Product Detail": ["product", "item", "detail", "pdp", "shop", "store"],
+    "Search Results": ["search", "results", "browse", "filter", "catalog", "list"],
+    "Empty State": ["empty", "404", "error", "not found", "zero"],
+}
+
+# Page layout inferred from the top style's keywords (first match wins)
+LAYOUT_KEYWORDS = {
+    "dense": ["data", "dense", "dashboard", "grid"],
+    "narrow": ["minimal", "simple", "clean", "single"],
+}
+
+_PAGE_TYPE_CLASSIFIER = KeywordClassifier(PAGE_TYPE_KEYWORDS)
+_LAYOUT_CLASSIFIER = KeywordClassifier(LAYOUT_KEYWORDS)
+
+
+# ============ REASONING RULES ============
+class _ReasoningIndex:
+    """ui-reasoning.csv compiled for lookup.
+
+    Matching precedence is unchanged: exact UI_Category, then substring
+    (either direction), then any UI_Category word in the category; the
+    earliest rule wins within each stage. Decision_Rules and
+    Style_Priority are parsed once.
+    """
+
+    def __init__(self, rules: list):
+        self.rules = rules
+        categories = [(rule.get("UI_Category") or "").lower() for rule in rules]
+
+        self.exact = {}
+        for idx, ui_cat in enumerate(categories):
+            self.exact.setdefault(ui_cat, idx)
+
+        # Substring stage: "ui_cat in category" via one automaton over all
+        # categories (an empty UI_Category matches anything), and
+        # "category in ui_cat" via one find() over the joined categories
+        self.contained = KeywordClassifier({idx: [ui_cat] for idx, ui_cat in enumerate(categories) if ui_cat})
+        self.first_empty = next((idx for idx, ui_cat in enumerate(categories) if not ui_cat), None)
+        self.haystack = "\0".join(categories)
+        self.starts = []
+        position = 0
+        for ui_cat in categories:
+            self.starts.append(position)
+            position += len(ui_cat) + 1
+
+        self.keywords = KeywordClassifier({
+            idx: ui_cat.replace("/", " ").replace("-", " ").split() for idx, ui_cat in enumerate(categories)
+        })
+
+        self.decision_rules = []
+        self.style_priority = []
+        for rule in rules:
+            try:
+                decision_rules = json.loads(rule.get("Decision_Rules") or "{}")
+            except json.JSONDecodeError:
+                decision_rules = {}
+            self.decision_rules.append(decision_rules)
+            self.style_priority.append([s.strip() for s in (rule.get("Style_Priority") or "").split("+")])
+
+    def find(self, category: str):
+        """Index of the matching rule, or None."""
+        category_lower = category.lower()
+
+        idx = self.exact.get(category_lower)
+        if idx is not None:
+            return idx
+
+        candidates = [self.contained.first(category_lower), self.first_empty]
+        if "\0" not in category_lower and self.rules:
+            position = self.haystack.find(category_lower)
+            if position >= 0:
+                candidates.append(bisect_right(self.starts, position) - 1)
+        candidates = [idx for idx in candidates if idx is not None]
+        if candidates:
+            return min(candidates)
+
+        return self.keywords.first(category_lower)
+
+
+# Compiled rules per reasoning CSV, reloaded when its mtime or size changes
+_REASONING_CACHE = {}
+
+
+def _reasoning_index() -> _ReasoningIndex:
+    """Compiled reasoning rules, cached at module level."""
+    filepath = DATA_DIR / REASONING_FILE
+    try:
+        stat = filepath.stat()
+    except OSError:
+        return _ReasoningIndex([])
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _REASONING_CACHE.get(filepath)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with open(filepath, 'r', encoding='utf-8') as f:
+        index = _ReasoningIndex(list(csv.DictReader(f)))
+    _REASONING_CACHE[filepath] = (signature, index)
+    return index
+
+
+# ============ SEARCH EXECUTOR ============
+_EXECUTOR = {"kind": None, "pool": None}
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _free_threaded() -> bool:
+    """True on a free-threaded build running with the GIL disabled."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def _resolve_executor(kind) -> str:
+    kind = (kind or SEARCH_EXECUTOR or "auto").lower()
+    if kind == "auto":
+        return "free" if _free_threaded() else "serial"
+    if kind not in SEARCH_EXECUTORS:
+        raise ValueError(f"Unknown search executor: {kind} (choose from {', '.join(SEARCH_EXECUTORS)}, auto)")
+    return kind
+
+
+def configure_search_executor(kind=None, workers=None) -> str:
+    """Select how domain searches are dispatched; returns the resolved kind.
+
+    Any pool from a previous configuration is shut down. None restores the
+    SEARCH_EXECUTOR default.
+    """
+    global SEARCH_WORKERS
+    resolved = _resolve_executor(kind)
+    with _EXECUTOR_LOCK:
+        pool = _EXECUTOR["pool"]
+        if workers:
+            SEARCH_WORKERS = workers
+        _EXECUTOR.update(kind=resolved, pool=None)
+    if pool is not None:
+        pool.shutdown(wait=True)
+    return resolved
+
+
+def search_executor() -> str:
+    """The executor kind searches are currently dispatched with."""
+    if _EXECUTOR["kind"] is None:
+        _EXECUTOR["kind"] = _resolve_executor(None)
+    return _EXECUTOR["kind"]
+
+
+def _executor_pool(kind):
+    """Lazily started pool for kind, reused across calls."""
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR["pool"] is None:
+            from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+            if kind == "process":
+                _EXECUTOR["pool"] = ProcessPoolExecutor(max_workers=SEARCH_WORKERS)
+            else:
+                _EXECUTOR["pool"] = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="uipro-search")
+        return _EXECUTOR["pool"]
+
+
+def _run_searches(tasks: list) -> list:
+    """Run (query, domain, max_results) searches; results in task order.
+
+    Each result lands in its task's slot, so the assembled output does not
+    depend on completion order.
+    """
+    kind = search_executor()
+    if kind == "serial" or len(tasks) < 2:
+        return [search(query, domain, max_results) for query, domain, max_results in tasks]
+
+    if kind == "free":
+        results = [None] * len(tasks)
+        errors = []
+
+        def run(pos, query, domain, max_results):
+            try:
+                results[pos] = search(query, domain, max_results)
+            except BaseException as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(pos, *task)) for pos, task in enumerate(tasks)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return results
+
+    pool = _executor_pool(kind)
+    futures = [pool.submit(search, query, domain, max_results) for query, domain, max_results in tasks]
+    return [future.result() for future in futures]
+
+
+# ============ SEARCH PLAN ============
+class SearchPlan:
+    """The (query, domain, max_results) lookups of one design-system run.
+
+    Lookups are added up front and run() executes each unique
+    (query, domain) once, at the largest max_results requested for it;
+    smaller requests are served from the prefix of that ranking. Lookups
+    not added before get() run on demand. Every get() counts as a
+    requested search; executions count once their result is first used,
+    so prefetched lookups nobody read show up as "unused". A plan belongs
+    to one run (one thread); everything it reads is shared safely.
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self.results = {}
+        self.runs = defaultdict(int)
+        self.requested = 0
+        self.executed = 0
+
+    def add(self, query: str, domain: str, max_results: int):
+        """Schedule a lookup for the next run() (no-op if already covered)."""
+        key = (query, domain)
+        done = self.results.get(key)
+        if done is None or done[0] < max_results:
+            self.pending[key] = max(self.pending.get(key, 0), max_results)
+
+    @profiled("design.searches")
+    def run(self):
+        """Execute pending lookups in one dispatch through the search executor."""
+        if not self.pending:
+            return
+        tasks = [(query, domain, max_results) for (query, domain), max_results in self.pending.items()]
+        self.pending = {}
+        for task, result in zip(tasks, _run_searches(tasks)):
+            self.results[task[:2]] = (task[2], result)
+            self.runs[task[:2]] += 1
+
+    def get(self, query: str, domain: str, max_results: int) -> dict:
+        """search() result for a lookup; runs it now if it was not planned."""
+        self.requested += 1
+        key = (query, domain)
+        done = self.results.get(key)
+        if done is None or done[0] < max_results:
+            self.add(query, domain, max_results)
+            self.run()
+            done = self.results[key]
+        self.executed += self.runs.pop(key, 0)
+        result = dict(done[1])
+        if "results" in result:
+            result["results"] = [dict(row) for row in result["results"][:max_results]]
+            result["count"] = len(result["results"])
+        return result
+
+    def report(self) -> dict:
+        return {
+            "requested": self.requested,
+            "executed": self.executed,
+            "saved": self.requested - self.executed,
+            "unused": sum(self.runs.values())
+        }
+
+
+def _override_lookups(page_name: str, page_query: str) -> list:
+    """Searches behind a page override file."""
+    combined_context = f"{page_name.lower()} {(page_query or '').lower()}"
+    return [
+        (combined_context, "style", 1),
+        (combined_context, "ux", 3),
+        (combined_context, "landing", 1)
+    ]
+
 
 # ============ DESIGN SYSTEM GENERATOR ============
 class DesignSystemGenerator:
-    """Generates design system recommendations from aggregated searches."""
+    """Generates design system recommendations from aggregated searches.
 
-    def __init__(self):
-        self.reasoning_data = self._load_reasoning()
+    Holds no state: the reasoning rules are resolved through
+    _reasoning_index() on every use, so one generator can serve any number
+    of threads and a long-lived one (daemon, manifest worker) picks up
+    edits to the reasoning CSV.
+    """
 
-    def _load_reasoning(self) -> list:
-        """Load reasoning rules from CSV."""
-        filepath = DATA_DIR / REASONING_FILE
-        if not filepath.exists():
-            return []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return list(csv.DictReader(f))
+    @property
+    def reasoning(self) -> _ReasoningIndex:
+        return _reasoning_index()
+
+    @property
+    def reasoning_data(self) -> list:
+        return self.reasoning.rules
 
-    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
-        """Execute searches across multiple domains."""
-        results = {}
+    def _domain_lookups(self, query: str, style_priority: list = None) -> list:
+        """(query, domain, max_results) per SEARCH_CONFIG domain."""
+        lookups = []
         for domain, config in SEARCH_CONFIG.items():
             if domain == "style" and style_priority:
                 # For style, also search with priority keywords
                 priority_query = " ".join(style_priority[:2]) if style_priority else query
                 combined_query = f"{query} {priority_query}"
-                results[domain] = search(combined_query, domain, config["max_results"])
+                lookups.append((combined_query, domain, config["max_results"]))
             else:
-                results[domain] = search(query, domain, config["max_results"])
-        return results
+                lookups.append((query, domain, config["max_results"]))
+        return lookups
+
+    def _multi_domain_search(self, query: str, style_priority: list = None, plan: SearchPlan = None) -> dict:
+        """Execute searches across multiple domains (in one batch; serial unless SEARCH_EXECUTOR selects a pool)."""
+        plan = plan if plan is not None else SearchPlan()
+        lookups = self._domain_lookups(query, style_priority)
+        for lookup in lookups:
+            plan.add(*lookup)
+        plan.run()
+        return {lookup[1]: plan.get(*lookup) for lookup in lookups}
 
     def _find_reasoning_rule(self, category: str) -> dict:
-        """Find matching reasoning rule for a category."""
-        category_lower = category.lower()
-
-        # Try exact match first
-        for rule in self.reasoning_data:
-            if rule.get("UI_Category", "").lower() == category_lower:
-                return rule
-
-        # Try partial match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            if ui_cat in category_lower or category_lower in ui_cat:
-                return rule
-
-        # Try keyword match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            keywords = ui_cat.replace("/", " ").replace("-", " ").split()
-            if any(kw in category_lower for kw in keywords):
-                return rule
-
-        return {}
+        """Find matching reasoning rule for a category (a copy)."""
+        reasoning = self.reasoning
+        idx = reasoning.find(category)
+        return dict(reasoning.rules[idx]) if idx is not None else {}
 
     def _apply_reasoning(self, category: str, search_results: dict) -> dict:
         """Apply reasoning rules to search results."""
-        rule = self._find_reasoning_rule(category)
+        reasoning = self.reasoning  # one snapshot, even if the CSV is reloaded meanwhile
+        idx = reasoning.find(category)
+        rule = reasoning.rules[idx] if idx is not None else {}
 
         if not rule:
             return {
@@ -101,21 +390,14 @@ class DesignSystemGenerator:
                 "severity": "MEDIUM"
             }
 
-        # Parse decision rules JSON
-        decision_rules = {}
-        try:
-            decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
-        except json.JSONDecodeError:
-            pass
-
         return {
             "pattern": rule.get("Recommended_Pattern", ""),
-            "style_priority": [s.strip() for s in rule.get("Style_Priority", "").split("+")],
+            "style_priority": list(reasoning.style_priority[idx]),
             "color_mood": rule.get("Color_Mood", ""),
             "typography_mood": rule.get("Typography_Mood", ""),
             "key_effects": rule.get("Key_Effects", ""),
             "anti_patterns": rule.get("Anti_Patterns", ""),
-            "decision_rules": decision_rules,
+            "decision_rules": copy.deepcopy(reasoning.decision_rules[idx]),
             "severity": rule.get("Severity", "MEDIUM")
         }
 
@@ -160,21 +442,37 @@ class DesignSystemGenerator:
         """Extract results list from search result dict."""
         return search_result.get("results", [])
 
-    def generate(self, query: str, project_name: str = None) -> dict:
-        """Generate complete design system recommendation."""
-        # Step 1: First search product to get category
-        product_result = search(query, "product", 1)
+    @profiled("design.generate")
+    def generate(self, query: str, project_name: str = None, pages: list = None,
+                 plan: SearchPlan = None) -> dict:
+        """Generate complete design system recommendation.
+
+        pages lists (page_name, page_query) overrides that will be rendered
+        from the same plan; their searches join the domain searches.
+        """
+        plan = plan if plan is not None else SearchPlan()
+
+        # Step 1: First search product to get category (at the k the domain pass needs)
+        plan.add(query, "product", 1)
+        plan.add(query, "product", SEARCH_CONFIG["product"]["max_results"])
+        plan.run()
+        product_result = plan.get(query, "product", 1)
         product_results = product_result.get("results", [])
         category = "General"
         if product_results:
             category = product_results[0].get("Product Type", "General")
 
         # Step 2: Get reasoning rules for this category
-        reasoning = self._apply_reasoning(category, {})
+        with span("design.reasoning"):
+            reasoning = self._apply_reasoning(category, {})
         style_priority = reasoning.get("style_priority", [])
 
-        # Step 3: Multi-domain search with style priority hints
-        search_results = self._multi_domain_search(query, style_priority)
+        # Step 3: Multi-domain search with style priority hints, planned
+        # together with the page override searches
+        for page_name, page_query in pages or []:
+            for lookup in _override_lookups(page_name, page_query):
+                plan.add(*lookup)
+        search_results = self._multi_domain_search(query, style_priority, plan)
         search_results["product"] = product_result  # Reuse product search
 
         # Step 4: Select best matches from each domain using priority
@@ -232,13 +530,15 @@ class DesignSystemGenerator:
             "key_effects": combined_effects,
             "anti_patterns": reasoning.get("anti_patterns", ""),
             "decision_rules": reasoning.get("decision_rules", {}),
-            "severity": reasoning.get("severity", "MEDIUM")
+            "severity": reasoning.get("severity", "MEDIUM"),
+            "search_plan": plan.report()
         }
 
 
 # ============ OUTPUT FORMATTERS ============
 BOX_WIDTH = 90  # Wider box for more content
 
+@profiled("format.ascii")
 def format_ascii_box(design_system: dict) -> str:
     """Format design system as ASCII box with emojis (MCP-style)."""
     project = design_system.get("project_name", "PROJECT")
@@ -364,6 +664,7 @@ def format_ascii_box(design_system: dict) -> str:
     return "\n".join(lines)
 
 
+@profiled("format.markdown")
 def format_markdown(design_system: dict) -> str:
     """Format design system as markdown."""
     project = design_system.get("project_name", "PROJECT")
@@ -460,7 +761,8 @@ def format_markdown(design_system: dict) -> str:
 
 # ============ MAIN ENTRY POINT ============
 def generate_design_system(query: str, project_name: str = None, output_format: str = "ascii", 
-                           persist: bool = False, page: str = None, output_dir: str = None) -> str:
+                           persist: bool = False, page: str = None, output_dir: str = None,
+                           generator: "DesignSystemGenerator" = None, plan: SearchPlan = None) -> str:
     """
     Main entry point for design system generation.
 
@@ -469,18 +771,25 @@ def generate_design_system(query: str, project_name: str = None, output_format:
         project_name: Optional project name for output header
         output_format: "ascii" (default) or "markdown"
         persist: If True, save design system to design-system/ folder
-        page: Optional page name for page-specific override file
+        page: Optional page name (or list of page names) for page-specific override files
         output_dir: Optional output directory (defaults to current working directory)
+        generator: Optional preloaded generator to reuse (e.g. in a long-lived process)
+        plan: Optional SearchPlan to run the lookups through; plan.report() then
+            gives the searches requested, executed and saved
 
     Returns:
         Formatted design system string
     """
-    generator = DesignSystemGenerator()
-    design_system = generator.generate(query, project_name)
+    generator = generator or DesignSystemGenerator()
+    plan = plan if plan is not None else SearchPlan()
+    page_names = [page] if isinstance(page, str) else list(page or [])
+    pages = [(page_name, query) for page_name in page_names] if persist else None
+    design_system = generator.generate(query, project_name, pages, plan)
     
     # Persist to files if requested
     if persist:
-        persist_design_system(design_system, page, output_dir, query)
+        persist_design_system(design_system, page, output_dir, query, plan)
+        design_system["search_plan"] = plan.report()
 
     if output_format == "markdown":
         return format_markdown(design_system)
@@ -488,15 +797,23 @@ def generate_design_system(query: str, project_name: str = None, output_format:
 
 
 # ============ PERSISTENCE FUNCTIONS ============
-def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None) -> dict:
+def _project_slug(project_name: str) -> str:
+    """Folder name under design-system/ for a project"""
+    return project_name.lower().replace(' ', '-')
+
+
+@profiled("persist")
+def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None,
+                          plan: SearchPlan = None) -> dict:
     """
     Persist design system to design-system/<project>/ folder using Master + Overrides pattern.
     
     Args:
         design_system: The generated design system dictionary
-        page: Optional page name for page-specific override file
+        page: Optional page name (or list of page names) for page-specific override files
         output_dir: Optional output directory (defaults to current working directory)
         page_query: Optional query string for intelligent page override generation
+        plan: Optional SearchPlan from generation, to reuse its page searches
     
     Returns:
         dict with created file paths and status
@@ -505,7 +822,7 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     
     # Use project name for project-specific folder
     project_name = design_system.get("project_name", "default")
-    project_slug = project_name.lower().replace(' ', '-')
+    project_slug = _project_slug(project_name)
     
     design_system_dir = base_dir / "design-system" / project_slug
     pages_dir = design_system_dir / "pages"
@@ -520,15 +837,15 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     
     # Generate and write MASTER.md
     master_content = format_master_md(design_system)
-    with open(master_file, 'w', encoding='utf-8') as f:
+    with span("persist.write"), open(master_file, 'w', encoding='utf-8') as f:
         f.write(master_content)
     created_files.append(str(master_file))
     
-    # If page is specified, create page override file with intelligent content
-    if page:
-        page_file = pages_dir / f"{page.lower().replace(' ', '-')}.md"
-        page_content = format_page_override_md(design_system, page, page_query)
-        with open(page_file, 'w', encoding='utf-8') as f:
+    # If pages are specified, create page override files with intelligent content
+    for page_name in [page] if isinstance(page, str) else page or []:
+        page_file = pages_dir / f"{page_name.lower().replace(' ', '-')}.md"
+        page_content = format_page_override_md(design_system, page_name, page_query, plan)
+        with span("persist.write"), open(page_file, 'w', encoding='utf-8') as f:
             f.write(page_content)
         created_files.append(str(page_file))
     
@@ -539,6 +856,7 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     }
 
 
+@profiled("format.master_md")
 def format_master_md(design_system: dict) -> str:
     """Format design system as MASTER.md with hierarchical override logic."""
     project = design_system.get("project_name", "PROJECT")
@@ -802,14 +1120,16 @@ def format_master_md(design_system: dict) -> str:
     return "\n".join(lines)
 
 
-def format_page_override_md(design_system: dict, page_name: str, page_query: str = None) -> str:
+@profiled("format.page_override")
+def format_page_override_md(design_system: dict, page_name: str, page_query: str = None,
+                            plan: SearchPlan = None) -> str:
     """Format a page-specific override file with intelligent AI-generated content."""
     project = design_system.get("project_name", "PROJECT")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     page_title = page_name.replace("-", " ").replace("_", " ").title()
     
     # Detect page type and generate intelligent overrides
-    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system)
+    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system, plan)
     
     lines = []
     
@@ -911,23 +1231,26 @@ def format_page_override_md(design_system: dict, page_name: str, page_query: str
     return "\n".join(lines)
 
 
-def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict) -> dict:
+@profiled("design.overrides")
+def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict,
+                                    plan: SearchPlan = None) -> dict:
     """
     Generate intelligent overrides based on page type using layered search.
     
     Uses the existing search infrastructure to find relevant style, UX, and layout
     data instead of hardcoded page types.
     """
-    from core import search
-    
     page_lower = page_name.lower()
     query_lower = (page_query or "").lower()
     combined_context = f"{page_lower} {query_lower}"
     
     # Search across multiple domains for page-specific guidance
-    style_search = search(combined_context, "style", max_results=1)
-    ux_search = search(combined_context, "ux", max_results=3)
-    landing_search = search(combined_context, "landing", max_results=1)
+    plan = plan if plan is not None else SearchPlan()
+    lookups = _override_lookups(page_name, page_query)
+    for lookup in lookups:
+        plan.add(*lookup)
+    plan.run()
+    style_search, ux_search, landing_search = [plan.get(*lookup) for lookup in lookups]
     
     # Extract results from search response
     style_results = style_search.get("results", [])
@@ -955,11 +1278,12 @@ def _generate_intelligent_overrides(page_name: str, page_query: str, design_syst
         effects = style.get("Effects & Animation", "")
         
         # Infer layout from style keywords
-        if any(kw in keywords.lower() for kw in ["data", "dense", "dashboard", "grid"]):
+        layout_kind = _LAYOUT_CLASSIFIER.first(keywords)
+        if layout_kind == "dense":
             layout["Max Width"] = "1400px or full-width"
             layout["Grid"] = "12-column grid for data flexibility"
             spacing["Content Density"] = "High — optimize for information display"
-        elif any(kw in keywords.lower() for kw in ["minimal", "simple", "clean", "single"]):
+        elif layout_kind == "narrow":
             layout["Max Width"] = "800px (narrow, focused)"
             layout["Layout"] = "Single column, centered"
             spacing["Content Density"] = "Low — focus on clarity"
@@ -1019,25 +1343,10 @@ def _generate_intelligent_overrides(page_name: str, page_query: str, design_syst
 
 def _detect_page_type(context: str, style_results: list) -> str:
     """Detect page type from context and search results."""
-    context_lower = context.lower()
-    
     # Check for common page type patterns
-    page_patterns = [
-        (["dashboard", "admin", "analytics", "data", "metrics", "stats", "monitor", "overview"], "Dashboard / Data View"),
-        (["checkout", "payment", "cart", "purchase", "order", "billing"], "Checkout / Payment"),
-        (["settings", "profile", "account", "preferences", "config"], "Settings / Profile"),
-        (["landing", "marketing", "homepage", "hero", "home", "promo"], "Landing / Marketing"),
-        (["login", "signin", "signup", "register", "auth", "password"], "Authentication"),
-        (["pricing", "plans", "subscription", "tiers", "packages"], "Pricing / Plans"),
-        (["blog", "article", "post", "news", "content", "story"], "Blog / Article"),
-        (["product", "item", "detail", "pdp", "shop", "store"], "Product Detail"),
-        (["search", "results", "browse", "filter", "catalog", "list"], "Search Results"),
-        (["empty", "404", "error", "not found", "zero"], "Empty State"),
-    ]
-    
-    for keywords, page_type in page_patterns:
-        if any(kw in context_lower for kw in keywords):
-            return page_type
+    page_type = _PAGE_TYPE_CLASSIFIER.first(context)
+    if page_type:
+        return page_type
     
     # Fallback: try to infer from style results
     if style_results:
@@ -1052,6 +1361,141 @@ def _detect_page_type(context: str, style_results: list) -> str:
     return "General"
 
 
+# ============ MANIFEST GENERATION ============
+_MANIFEST_GENERATOR = None
+
+
+def _warm_generation():
+    """Load the indices and reasoning rules design-system generation reads."""
+    for domain in [*SEARCH_CONFIG, "ux"]:
+        config = CSV_CONFIG[domain]
+        get_index(DATA_DIR / config["file"], config["search_cols"], config["output_cols"])
+    return DesignSystemGenerator()
+
+
+def _init_manifest_worker():
+    """Pool initializer: warm indices once per worker; searches stay in-process."""
+    global _MANIFEST_GENERATOR
+    configure_search_executor("serial")
+    _MANIFEST_GENERATOR = _warm_generation()
+
+
+def manifest_pool(kind: str = None) -> str:
+    """Pool kind generate_manifest() will actually use for kind (default MANIFEST_POOL)."""
+    kind = (kind or MANIFEST_POOL).lower()
+    if kind not in MANIFEST_POOLS:
+        raise ValueError(f"Unknown manifest pool: {kind} (choose from {', '.join(MANIFEST_POOLS)})")
+    if kind == "interpreter":
+        try:
+            from concurrent.futures import InterpreterPoolExecutor  # noqa: F401
+        except ImportError:
+            return "process"
+    return kind
+
+
+def _manifest_executor(kind: str, workers: int):
+    from concurrent import futures
+    if kind == "thread":
+        return futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="uipro-manifest")
+    if kind == "interpreter":
+        # Subinterpreters do not inherit the script directory on sys.path, so
+        # the initializer is a bootstrap script (exec is pickled by reference)
+        bootstrap = (f"import sys\nsys.path.insert(0, {str(Path(__file__).parent)!r})\n"
+                     "import design_system\ndesign_system._init_manifest_worker()\n")
+        return futures.InterpreterPoolExecutor(max_workers=workers, initializer=exec, initargs=(bootstrap, {}))
+    return futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_manifest_worker)
+
+
+def _generate_project(entry: dict, output_dir: str, generator: "DesignSystemGenerator" = None) -> dict:
+    """Generate and persist one manifest project; returns its status."""
+    import time
+    start = time.perf_counter()
+    status = {"line": entry.get("line"), "project": entry.get("project_name") or entry.get("query")}
+    try:
+        query, pages = entry["query"], entry.get("pages") or []
+        plan = SearchPlan()
+        generator = generator or _MANIFEST_GENERATOR or DesignSystemGenerator()
+        design_system = generator.generate(query, entry.get("project_name"), [(page, query) for page in pages], plan)
+        persisted = persist_design_system(design_system, pages, output_dir, query, plan)
+    except Exception as e:
+        status.update(status="error", error=f"{type(e).__name__}: {e}")
+    else:
+        status.update(status="ok", design_system_dir=persisted["design_system_dir"],
+                      created_files=persisted["created_files"], searches=plan.report())
+    status["ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return status
+
+
+def generate_manifest(entries, output_dir: str = None, workers: int = None, pool: str = None):
+    """Generate and persist a design system per manifest entry.
+
+    entries yields dicts with "query" and optional "project_name", "pages"
+    and "line"; entries carrying an "error" are reported as-is. Projects
+    run in a pool of workers (see MANIFEST_POOL): worker processes and
+    subinterpreters are each warmed once by their initializer, with
+    indices mmap-shared through the index cache; threads share this
+    process's indices and generator. A status dict is yielded as each
+    project finishes, so order follows completion. At most 2 * workers
+    projects are in flight. A project whose folder (slug) an earlier
+    entry already writes gets an error status instead of racing it.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    kind = manifest_pool(pool)
+    workers = workers or os.cpu_count() or 1
+    output_dir = os.path.abspath(output_dir or os.getcwd())
+    # Builds any missing index cache once, before workers start
+    generator = _warm_generation()
+    entries = _dedupe_projects(entries)
+
+    if workers == 1:
+        for entry in entries:
+            yield _error_status(entry) if "error" in entry else _generate_project(entry, output_dir, generator)
+        return
+
+    shared = generator if kind == "thread" else None
+    with _manifest_executor(kind, workers) as executor:
+        pending = set()
+        for entry in entries:
+            if "error" in entry:
+                yield _error_status(entry)
+                continue
+            pending.add(executor.submit(_generate_project, entry, output_dir, shared))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def _dedupe_projects(entries):
+    """Turn entries whose project folder an earlier entry owns into errors (first in manifest order wins).
+
+    Entries without a string query or project name become errors too, so
+    one bad entry cannot end the run.
+    """
+    owners = {}
+    for position, entry in enumerate(entries, 1):
+        if "error" not in entry and not isinstance(entry.get("query"), str):
+            entry = {"line": entry.get("line"), "error": "Missing query"}
+        elif "error" not in entry and not isinstance(entry.get("project_name") or "", str):
+            entry = {"line": entry.get("line"), "error": "project_name must be a string"}
+        if "error" not in entry:
+            slug = _project_slug(entry.get("project_name") or entry["query"].upper())
+            owner = owners.setdefault(slug, (position, entry.get("line", position)))
+            if owner[0] != position:
+                entry = {"line": entry.get("line"),
+                         "error": f"Duplicate project: design-system/{slug} is already generated by line {owner[1]}"}
+        yield entry
+
+
+def _error_status(entry: dict) -> dict:
+    return {"line": entry.get("line"), "project": None, "status": "error", "error": entry["error"]}
+
+
 # ============ CLI SUPPORT ============
 if __name__ == "__main__":
     import argparse
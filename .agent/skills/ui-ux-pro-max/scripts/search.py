@@ -4,27 +4,84 @@
 UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
 Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
        python search.py "<query>" --design-system [-p "Project Name"]
-       python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard"]
+       python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard" ...]
+       python search.py --design-system --manifest projects.jsonl [--workers N] [--pool process] [-o DIR]
+       python search.py [--rebuild-index] ["<query>" ...]
+       python search.py "<query>" --all [--max-results 3]
+       python search.py --mem-report [--backend sparse] [--json]
+       python search.py --serve [--socket <path>]
+       python search.py --batch queries.txt [--domain <domain>] [--stack <stack>]   (use - for stdin)
 
 Domains: style, prompt, color, chart, landing, product, ux, typography
 Stacks: html-tailwind, react, nextjs
 
 Persistence (Master + Overrides pattern):
   --persist    Save design system to design-system/MASTER.md
-  --page       Also create a page-specific override file in design-system/pages/
+  --page       Also create page-specific override files in design-system/pages/; takes
+               several names, comma-separated names, or globs (each matching
+               file's stem becomes a page, e.g. --page "src/pages/*.tsx")
+  --manifest   JSONL of projects ({"query", "project_name", "pages": [...]}, one per
+               line; - for stdin); each is generated and persisted in a pool of
+               --workers processes (default: CPU count), printing a JSON status
+               line as each project finishes; --pool thread|interpreter runs the
+               workers as threads or subinterpreters (Python 3.14+) instead. A
+               project whose folder an earlier line already writes is an error
+  Domain searches are dispatched by UIPRO_SEARCH_EXECUTOR (serial, thread, process,
+  free; default auto = plain threads on free-threaded builds, serial otherwise)
+
+Federated search:
+  --all         Search every domain and stack in one pass; prints the global
+                top results plus the best hit from each domain/stack
+
+Batch mode:
+  --batch FILE  One query per line, or JSONL objects with "query" and optional
+                "domain", "stack", "max_results"; prints one JSON result per line
+
+Resident daemon:
+  --serve       Preload every index and answer requests on a Unix socket; later
+                search.py calls forward to it automatically (UIPRO_NO_DAEMON=1 opts out)
+  --watch [S]   Poll data/*.csv and data/stacks/*.csv every S seconds (default 1) and
+                apply edited rows to the resident indices; combine with --serve, or
+                run alone to keep the on-disk index cache current
+
+Index cache:
+  --rebuild-index  Refit every domain/stack index and overwrite the on-disk cache
+  Cached indices are binary files queried through mmap, so concurrent processes
+  share one page-cache copy (UIPRO_CACHE_DIR relocates, UIPRO_INDEX_CACHE=0 disables)
+  CSVs are indexed row by row; UIPRO_BUILD_WORKERS=N tokenizes CSVs of 16 MiB or more
+  in N processes
+
+Result cache:
+  --result-cache-db PATH  Share cached query results across processes via SQLite
+  --cache-stats           Print result-cache hit/miss statistics to stderr
+
+Profiling:
+  --profile [text|json]   Print per-stage timings (index build/load, tokenize, fit,
+                          scoring, reasoning, formatting, file writes) to stderr;
+                          runs in-process. Manifest worker processes are not included
+  --mem-report            Fit every domain/stack index in memory and report the bytes
+                          retained by rows, postings, vocabulary and matrix, the peak
+                          while fitting (tracemalloc) and the mapped cache footprint
 """
 
+# Startup budget: keep module-level imports cheap (see check_startup.py).
+# design_system, socketserver and numpy/scipy load only on the paths that use them.
 import argparse
+import json
+import os
 import sys
-import io
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
-from design_system import generate_design_system, persist_design_system
+from core import (CSV_CONFIG, AVAILABLE_STACKS, BACKENDS, MAX_RESULTS, configure_result_cache, rebuild_indices, watch,
+                  enable_profiling, profile_report, memory_report)
+from daemon import call, serve
 
-# Force UTF-8 for stdout/stderr to handle emojis on Windows (cp1252 default)
-if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-if sys.stderr.encoding and sys.stderr.encoding.lower() != 'utf-8':
-    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+def _force_utf8_stdio():
+    """Force UTF-8 for stdout/stderr to handle emojis on Windows (cp1252 default)"""
+    import io
+    if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    if sys.stderr.encoding and sys.stderr.encoding.lower() != 'utf-8':
+        sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
 
 def format_output(result):
@@ -53,33 +110,334 @@ def format_output(result):
     return "\n".join(output)
 
 
+def format_federated_output(result):
+    """Format search_all() results: global top-k, then the best hit per source"""
+    output = []
+    output.append(f"## UI Pro Max Federated Search")
+    output.append(f"**Query:** {result['query']} | **Found:** {result['count']} results\n")
+
+    for i, hit in enumerate(result['results'], 1):
+        source = f"stack: {hit['stack']}" if "stack" in hit else f"domain: {hit['domain']}"
+        output.append(f"### Result {i} ({source}, score {hit['score']})")
+        for key, value in hit['row'].items():
+            value_str = str(value)
+            if len(value_str) > 300:
+                value_str = value_str[:300] + "..."
+            output.append(f"- **{key}:** {value_str}")
+        output.append("")
+
+    output.append("### Best match per source")
+    for label, group in (("domain", result['domains']), ("stack", result['stacks'])):
+        for name, entry in group.items():
+            if entry['results']:
+                first = next(iter(entry['results'][0].values()), "")
+                output.append(f"- **{label} {name}** ({entry['count']}): {first}")
+    output.append("")
+
+    return "\n".join(output)
+
+
+def format_profile(report):
+    """Per-stage timing table for --profile"""
+    wall = report["wall_ms"]
+    output = [f"## Profile: {wall:.2f} ms wall (stage totals are inclusive of nested stages)"]
+    output.append(f"{'stage':<24}{'calls':>7}{'total ms':>11}{'mean us':>10}{'max us':>10}{'% wall':>8}")
+    for name, stage in report["stages"].items():
+        share = 100 * stage["total_ms"] / wall if wall else 0.0
+        output.append(f"{name:<24}{stage['calls']:>7}{stage['total_ms']:>11.3f}{stage['mean_us']:>10.1f}"
+                      f"{stage['max_us']:>10.1f}{share:>7.1f}%")
+    return "\n".join(output)
+
+
+def _print_profile(fmt):
+    """--profile output on stderr (also on sys.exit paths, via atexit)"""
+    report = profile_report()
+    if fmt == "json":
+        print(json.dumps({"profile": report}), file=sys.stderr)
+    else:
+        print(format_profile(report), file=sys.stderr)
+
+
+def _kib(size):
+    return f"{size / 1024:.1f}"
+
+
+def format_memory_report(report):
+    """Per-source memory table for --mem-report (sizes in KiB)"""
+    totals = report["totals"]
+    output = [f"## Memory ({report['backend']} backend): {_kib(totals['retained_bytes'])} KiB retained, "
+              f"{_kib(totals['max_fit_peak_bytes'])} KiB max fit peak"]
+    output.append(f"{'source':<24}{'rows':>6}{'terms':>7}{'retained':>10}{'peak':>9}{'rows KiB':>10}"
+                  f"{'postings':>10}{'vocab':>8}{'matrix':>8}{'mapped':>9}{'heap':>7}")
+    for entry in report["sources"]:
+        parts = entry["parts"]
+        mapped = entry.get("mapped")
+        output.append(
+            f"{entry['source']:<24}{entry['rows']:>6}{entry['terms']:>7}{_kib(entry['retained_bytes']):>10}"
+            f"{_kib(entry['fit_peak_bytes']):>9}{_kib(parts['rows']):>10}{_kib(parts['postings']):>10}"
+            f"{_kib(parts['vocabulary']):>8}{_kib(parts['matrix']):>8}"
+            f"{_kib(mapped['file_bytes']) if mapped else '-':>9}{_kib(mapped['heap_bytes']) if mapped else '-':>7}"
+        )
+    output.append("retained/peak: tracemalloc, in-memory fit; rows..matrix: deep size of each part; "
+                  "mapped/heap: cache file and heap cost of opening it")
+    return "\n".join(output)
+
+
+def _print_cache_stats():
+    """Result-cache statistics (from the daemon when one is serving)"""
+    print(f"Result cache: {json.dumps(call('result_cache_stats'))}", file=sys.stderr)
+
+
+BATCH_CHUNK = 500
+
+
+def _parse_batch_line(line, domain, stack, max_results):
+    """Turn a plain-text or JSONL batch line into a request dict"""
+    if line.lstrip().startswith("{"):
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError as e:
+            return {"error": f"Invalid JSON: {e}"}
+        if not isinstance(entry.get("query"), str):
+            return {"error": "Missing query"}
+        request = {
+            "query": entry["query"],
+            "domain": entry.get("domain", domain),
+            "stack": entry.get("stack", stack),
+            "max_results": entry.get("max_results", max_results)
+        }
+        # One bad line must not fail the rest of its chunk
+        if request["domain"] is not None and request["domain"] not in CSV_CONFIG:
+            return {"error": f"Unknown domain: {request['domain']}. Available: {', '.join(CSV_CONFIG)}"}
+        if request["stack"] is not None and request["stack"] not in AVAILABLE_STACKS:
+            return {"error": f"Unknown stack: {request['stack']}. Available: {', '.join(AVAILABLE_STACKS)}"}
+        if isinstance(request["max_results"], bool) or not isinstance(request["max_results"], int) \
+                or request["max_results"] < 1:
+            return {"error": f"max_results must be an integer >= 1, got {request['max_results']!r}"}
+        return request
+    return {"query": line.strip(), "domain": domain, "stack": stack, "max_results": max_results}
+
+
+def _run_batch_chunk(requests, backend):
+    """Answer a chunk of requests, grouping domain queries per search_many() call"""
+    results = [None] * len(requests)
+    groups = {}
+    for pos, request in enumerate(requests):
+        if "error" in request:
+            results[pos] = request
+        elif request["stack"]:
+            results[pos] = call("search_stack", query=request["query"], stack=request["stack"],
+                                max_results=request["max_results"], backend=backend)
+        else:
+            groups.setdefault((request["domain"], request["max_results"]), []).append(pos)
+
+    for (domain, max_results), positions in groups.items():
+        answers = call("search_many", queries=[requests[pos]["query"] for pos in positions],
+                       domain=domain, max_results=max_results, backend=backend)
+        for pos, answer in zip(positions, answers):
+            results[pos] = answer
+    return results
+
+
+def _expand_pages(values):
+    """Page names from names, comma-separated lists and file globs (file stem = page), deduplicated"""
+    pages = []
+    for value in values or []:
+        for item in value.split(","):
+            item = item.strip()
+            if any(ch in item for ch in "*?["):
+                import glob
+                names = [os.path.splitext(os.path.basename(path))[0] for path in sorted(glob.glob(item))]
+                if not names:
+                    raise ValueError(f"No files match page pattern: {item}")
+            else:
+                names = [item] if item else []
+            for name in names:
+                if name not in pages:
+                    pages.append(name)
+    return pages
+
+
+def _parse_manifest_line(line, line_number):
+    """Turn a manifest JSONL line into a generate_manifest() entry"""
+    try:
+        entry = json.loads(line)
+    except json.JSONDecodeError as e:
+        return {"line": line_number, "error": f"Invalid JSON: {e}"}
+    if not isinstance(entry, dict) or not isinstance(entry.get("query"), str):
+        return {"line": line_number, "error": "Missing query"}
+    for key in ("project_name", "project"):
+        if entry.get(key) is not None and not isinstance(entry[key], str):
+            return {"line": line_number, "error": f"{key} must be a string"}
+    pages = entry.get("pages")
+    if pages is None:
+        pages = []
+    elif isinstance(pages, str):
+        pages = [pages]
+    if not isinstance(pages, list) or not all(isinstance(page, str) for page in pages):
+        return {"line": line_number, "error": "pages must be a page name or a list of page names"}
+    try:
+        pages = _expand_pages(pages)
+    except ValueError as e:
+        return {"line": line_number, "error": str(e)}
+    return {
+        "line": line_number,
+        "query": entry["query"],
+        "project_name": entry.get("project_name") or entry.get("project"),
+        "pages": pages
+    }
+
+
+def run_manifest(lines, output_dir=None, workers=None, pool=None):
+    """Yield one status dict per manifest project, as each one finishes"""
+    from design_system import generate_manifest
+    entries = (_parse_manifest_line(line, number) for number, line in enumerate(lines, 1) if line.strip())
+    return generate_manifest(entries, output_dir, workers, pool)
+
+
+def run_batch(lines, domain=None, stack=None, max_results=MAX_RESULTS, backend=None):
+    """Yield one JSON result line per non-empty input line, in input order"""
+    chunk = []
+    for line in lines:
+        if not line.strip():
+            continue
+        chunk.append(_parse_batch_line(line, domain, stack, max_results))
+        if len(chunk) >= BATCH_CHUNK:
+            for result in _run_batch_chunk(chunk, backend):
+                yield json.dumps(result, ensure_ascii=False)
+            chunk = []
+    for result in _run_batch_chunk(chunk, backend):
+        yield json.dumps(result, ensure_ascii=False)
+
+
 if __name__ == "__main__":
+    _force_utf8_stdio()
+
     parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
+    parser.add_argument("query", nargs="?", help="Search query")
     parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
     parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
     parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--all", action="store_true", help="Search every domain and stack in one pass")
+    parser.add_argument("--backend", choices=list(BACKENDS.keys()), default=None, help="Scoring backend (sparse needs numpy + scipy; default: python)")
     # Design system generation
     parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
     parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
     parser.add_argument("--format", "-f", choices=["ascii", "markdown"], default="ascii", help="Output format for design system")
     # Persistence (Master + Overrides pattern)
     parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
-    parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/pages/")
+    parser.add_argument("--page", type=str, nargs="+", default=None, help="Create page-specific override files in design-system/pages/ (names, comma-separated names or file globs)")
     parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
+    parser.add_argument("--manifest", type=str, default=None, metavar="FILE", help="With --design-system: generate and persist every project in a JSONL manifest (or - for stdin)")
+    parser.add_argument("--workers", type=int, default=None, help="Workers for --manifest (default: CPU count)")
+    parser.add_argument("--pool", choices=["process", "thread", "interpreter"], default=None, help="Worker pool for --manifest (default: $UIPRO_MANIFEST_POOL or process; interpreter needs Python 3.14+, else process)")
+    # Batch mode
+    parser.add_argument("--batch", type=str, default=None, metavar="FILE", help="Answer one query per line of FILE (or - for stdin), printing JSON lines")
+    # Resident daemon
+    parser.add_argument("--serve", action="store_true", help="Run a resident search daemon on a Unix socket")
+    parser.add_argument("--socket", type=str, default=None, help="Daemon socket path (default: $UIPRO_SOCKET or the index cache dir)")
+    parser.add_argument("--watch", type=float, nargs="?", const=1.0, default=None, metavar="SECONDS", help="Apply CSV edits to resident indices as row deltas (poll interval, default 1s)")
+    # Index cache
+    parser.add_argument("--rebuild-index", action="store_true", help="Refit all indices and overwrite the on-disk index cache")
+    # Result cache
+    parser.add_argument("--result-cache-db", type=str, default=None, help="SQLite file for sharing cached results across processes")
+    parser.add_argument("--cache-stats", action="store_true", help="Print result-cache statistics to stderr")
+    # Profiling
+    parser.add_argument("--mem-report", action="store_true", help="Report per-domain/stack index memory (retained, fit peak, per-part sizes) and exit")
+    parser.add_argument("--profile", nargs="?", const="text", choices=["text", "json"], default=None, help="Print a per-stage timing breakdown to stderr (text or json); runs in-process, bypassing the daemon")
 
     args = parser.parse_args()
 
+    if args.profile:
+        import atexit
+        os.environ["UIPRO_NO_DAEMON"] = "1"  # time this process's work, not a daemon round trip
+        enable_profiling()
+        atexit.register(_print_profile, args.profile)
+
+    if args.socket:
+        os.environ["UIPRO_SOCKET"] = args.socket
+    if args.result_cache_db:
+        configure_result_cache(path=args.result_cache_db)
+
+    if args.serve:
+        try:
+            serve(args.socket, on_ready=lambda path: print(f"Listening on {path}", flush=True),
+                  watch_interval=args.watch, on_change=lambda change: print(json.dumps(change), flush=True))
+        except KeyboardInterrupt:
+            pass
+        except RuntimeError as e:
+            parser.exit(1, f"Error: {e}\n")
+        sys.exit(0)
+
+    if args.watch is not None:
+        if args.query is not None or args.batch is not None:
+            parser.error("--watch runs on its own or together with --serve")
+        print(f"Watching guideline CSVs every {args.watch}s (Ctrl-C to stop)", flush=True)
+        try:
+            watch(args.watch, on_change=lambda change: print(json.dumps(change), flush=True), backend=args.backend)
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    if args.mem_report:
+        report = memory_report(args.backend)
+        print(json.dumps(report, indent=2) if args.json else format_memory_report(report))
+        sys.exit(0)
+
+    if args.rebuild_index:
+        rebuilt = rebuild_indices()
+        if args.query is None and args.batch is None:
+            print(f"Rebuilt {len(rebuilt)} indices")
+            sys.exit(0)
+
+    if args.batch is not None:
+        if args.query is not None:
+            parser.error("--batch does not take a positional query")
+        stream = sys.stdin if args.batch == "-" else open(args.batch, 'r', encoding='utf-8')
+        with stream:
+            for line in run_batch(stream, args.domain, args.stack, args.max_results, args.backend):
+                print(line, flush=True)
+        if args.cache_stats:
+            _print_cache_stats()
+        sys.exit(0)
+
+    if args.manifest is not None:
+        if not args.design_system or args.query is not None:
+            parser.error("--manifest needs --design-system and no positional query")
+        import time
+        start = time.perf_counter()
+        counts = {"ok": 0, "error": 0}
+        stream = sys.stdin if args.manifest == "-" else open(args.manifest, 'r', encoding='utf-8')
+        with stream:
+            for status in run_manifest(stream, args.output_dir, args.workers, args.pool):
+                counts[status["status"]] += 1
+                print(json.dumps(status, ensure_ascii=False), flush=True)
+        elapsed = time.perf_counter() - start
+        total = counts["ok"] + counts["error"]
+        from design_system import manifest_pool
+        print(f"Generated {counts['ok']}/{total} design systems in {elapsed:.2f}s "
+              f"({total / elapsed if elapsed else 0:.1f} projects/s, {manifest_pool(args.pool)} pool)", file=sys.stderr)
+        sys.exit(1 if counts["error"] else 0)
+
+    if args.query is None:
+        parser.error("the following arguments are required: query")
+
+    try:
+        pages = _expand_pages(args.page)
+    except ValueError as e:
+        parser.error(str(e))
+
     # Design system takes priority
     if args.design_system:
-        result = generate_design_system(
-            args.query, 
-            args.project_name, 
-            args.format,
+        result = call(
+            "generate_design_system",
+            query=args.query,
+            project_name=args.project_name,
+            output_format=args.format,
             persist=args.persist,
-            page=args.page,
-            output_dir=args.output_dir
+            page=pages,
+            output_dir=os.path.abspath(args.output_dir or os.getcwd())
         )
         print(result)
         
@@ -89,26 +447,34 @@ if __name__ == "__main__":
             print("\n" + "=" * 60)
             print(f"✅ Design system persisted to design-system/{project_slug}/")
             print(f"   📄 design-system/{project_slug}/MASTER.md (Global Source of Truth)")
-            if args.page:
-                page_filename = args.page.lower().replace(' ', '-')
+            for page in pages:
+                page_filename = page.lower().replace(' ', '-')
                 print(f"   📄 design-system/{project_slug}/pages/{page_filename}.md (Page Overrides)")
             print("")
             print(f"📖 Usage: When building a page, check design-system/{project_slug}/pages/[page].md first.")
             print(f"   If exists, its rules override MASTER.md. Otherwise, use MASTER.md.")
             print("=" * 60)
+    # Federated search
+    elif args.all:
+        result = call("search_all", query=args.query, max_results=args.max_results, backend=args.backend)
+        if args.json:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            print(format_federated_output(result))
     # Stack search
     elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
+        result = call("search_stack", query=args.query, stack=args.stack, max_results=args.max_results, backend=args.backend)
         if args.json:
-            import json
             print(json.dumps(result, indent=2, ensure_ascii=False))
         else:
             print(format_output(result))
     # Domain search
     else:
-        result = search(args.query, args.domain, args.max_results)
+        result = call("search", query=args.query, domain=args.domain, max_results=args.max_results, backend=args.backend)
         if args.json:
-            import json
             print(json.dumps(result, indent=2, ensure_ascii=False))
         else:
             print(format_output(result))
+
+    if args.cache_stats:
+        _print_cache_stats()